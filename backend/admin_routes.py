@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from models import db, Usuario, Candidato, Pregunta, RespuestaCandidato, Configuracion, FuenteNoticia
 import bcrypt
-from datetime import datetime
+from datetime import datetime, timezone
+import os
+from sqlalchemy import BigInteger, case, cast, func, literal, literal_column, select, text, true
+from sqlalchemy.exc import OperationalError
+import content_version
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -78,7 +82,8 @@ def get_config():
         'election_title': config.election_title,
         'election_type': config.election_type,
         'site_name': config.site_name,
-        'maintenance_mode': config.maintenance_mode
+        'maintenance_mode': config.maintenance_mode,
+        'ronda_actual': config.ronda_actual
     }), 200
 
 @admin_bp.route('/config', methods=['PUT'])
@@ -104,6 +109,7 @@ def update_config():
         config.maintenance_mode = data['maintenance_mode']
 
     config.updated_at = datetime.utcnow()
+    content_version.bump(content_version.CONFIG)
     db.session.commit()
 
     return jsonify({'message': 'Configuración actualizada'}), 200
@@ -141,6 +147,7 @@ def create_candidato():
     )
 
     db.session.add(candidato)
+    content_version.bump(content_version.CATALOGO)
     db.session.commit()
 
     return jsonify({
@@ -168,6 +175,7 @@ def update_candidato(id):
     if 'linea_tiempo' in data:
         candidato.linea_tiempo = data['linea_tiempo']
 
+    content_version.bump(content_version.CATALOGO)
     db.session.commit()
 
     return jsonify({'message': 'Candidato actualizado'}), 200
@@ -178,6 +186,7 @@ def delete_candidato(id):
     """Eliminar candidato"""
     candidato = Candidato.query.get_or_404(id)
     db.session.delete(candidato)
+    content_version.bump(content_version.CATALOGO)
     db.session.commit()
 
     return jsonify({'message': 'Candidato eliminado'}), 200
@@ -212,6 +221,7 @@ def create_pregunta():
     )
 
     db.session.add(pregunta)
+    content_version.bump(content_version.CATALOGO)
     db.session.commit()
 
     return jsonify({
@@ -233,6 +243,7 @@ def update_pregunta(id):
     if 'orden' in data:
         pregunta.orden = data['orden']
 
+    content_version.bump(content_version.CATALOGO)
     db.session.commit()
 
     return jsonify({'message': 'Pregunta actualizada'}), 200
@@ -243,6 +254,7 @@ def delete_pregunta(id):
     """Eliminar pregunta"""
     pregunta = Pregunta.query.get_or_404(id)
     db.session.delete(pregunta)
+    content_version.bump(content_version.CATALOGO)
     db.session.commit()
 
     return jsonify({'message': 'Pregunta eliminada'}), 200
@@ -252,7 +264,22 @@ def delete_pregunta(id):
 @admin_bp.route('/respuestas', methods=['GET'])
 @admin_required
 def get_respuestas_admin():
-    """Obtener todas las respuestas de candidatos"""
+    """
+    Obtener todas las respuestas de candidatos
+
+    Con ?format=matrix devuelve la forma compacta: ids y nombres de candidatos
+    (columnas), ids de preguntas (filas) y la grilla de posiciones, con null
+    donde no hay respuesta.
+    """
+    if request.args.get('format') == 'matrix':
+        import catalog
+        import position_matrix
+        matriz = position_matrix.load()
+        del matriz['textos']
+        por_id = catalog.get_snapshot().candidatos_por_id
+        matriz['nombres'] = [por_id[c].nombre if c in por_id else None for c in matriz['candidatos']]
+        return jsonify(matriz), 200
+
     respuestas = RespuestaCandidato.query.all()
     return jsonify([{
         'id': r.id,
@@ -275,6 +302,7 @@ def create_respuesta():
 
     if existente:
         existente.posicion = data.get('posicion')
+        content_version.bump(content_version.CATALOGO)
         db.session.commit()
         return jsonify({'message': 'Respuesta actualizada'}), 200
 
@@ -285,10 +313,59 @@ def create_respuesta():
     )
 
     db.session.add(respuesta)
+    content_version.bump(content_version.CATALOGO)
     db.session.commit()
 
     return jsonify({'message': 'Respuesta creada'}), 201
 
+def _lista_ids(nombre):
+    """Ids separados por coma en el query string (None si no se indicó)"""
+    valor = request.args.get(nombre)
+    if not valor:
+        return None
+    return [int(v) for v in valor.split(',') if v.strip()]
+
+@admin_bp.route('/respuestas/matriz', methods=['GET'])
+@admin_required
+def export_matriz():
+    """
+    Exportar la matriz de posiciones (o un corte con ?preguntas=1,2&candidatos=3)
+    en JSON o, con ?format=csv, en CSV
+    """
+    import position_matrix
+    try:
+        matriz = position_matrix.load(_lista_ids('candidatos'), _lista_ids('preguntas'))
+    except ValueError:
+        return jsonify({'error': 'Los ids deben ser números separados por coma'}), 400
+
+    if request.args.get('format') == 'csv':
+        return current_app.response_class(
+            position_matrix.to_csv(matriz),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=posiciones.csv'}
+        )
+    return jsonify(matriz), 200
+
+@admin_bp.route('/respuestas/matriz', methods=['PUT'])
+@admin_required
+def import_matriz():
+    """Importar la matriz (o un corte) en JSON o CSV (Content-Type: text/csv) en una transacción"""
+    import position_matrix
+    try:
+        if request.mimetype == 'text/csv':
+            matriz = position_matrix.parse_csv(request.get_data(as_text=True))
+        else:
+            matriz = position_matrix.parse_json(request.get_json(silent=True))
+        escritas, borradas = position_matrix.upsert(matriz)
+    except position_matrix.MatrixError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+    content_version.bump(content_version.CATALOGO)
+    db.session.commit()
+
+    return jsonify({'message': 'Posiciones guardadas', 'escritas': escritas, 'borradas': borradas}), 200
+
 # ==================== FUENTES DE NOTICIAS ====================
 
 @admin_bp.route('/fuentes-noticias', methods=['GET'])
@@ -369,42 +446,190 @@ def delete_fuente_noticia(id):
 
 # ==================== ESTADÍSTICAS ====================
 
+def _contar(modelo, *filtros):
+    return select(func.count()).select_from(modelo).where(*filtros).scalar_subquery()
+
+def _estimar(tabla, exacto):
+    """Filas estimadas por el planificador de PostgreSQL (exacto si la tabla nunca se analizó)"""
+    reltuples = select(literal_column('reltuples')).select_from(text('pg_class')).where(
+        text(f"oid = '{tabla}'::regclass")
+    ).scalar_subquery()
+    return case((reltuples >= 0, cast(reltuples, BigInteger)), else_=exacto)
+
 @admin_bp.route('/stats', methods=['GET'])
 @admin_required
 def get_stats():
-    """Obtener estadísticas generales"""
-    from models import Voto, Noticia
-
-    total_candidatos = Candidato.query.count()
-    total_preguntas = Pregunta.query.count()
-    total_votos = Voto.query.count()
-    total_noticias = Noticia.query.filter_by(is_active=True).count()
-
-    # Votos por candidato
-    votos_por_candidato = db.session.query(
-        Candidato.nombre,
-        db.func.count(Voto.id).label('votos')
-    ).join(Voto).group_by(Candidato.id, Candidato.nombre).all()
+    """
+    Obtener estadísticas generales en una sola consulta
+
+    Con ?mode=fast las tablas grandes (noticias) usan la estimación del
+    planificador de PostgreSQL y se informan en `approximate`. Los votos
+    siempre salen de los contadores mantenidos (conteo_votos), que son exactos.
+    """
+    from models import Noticia, ConteoVoto
+    from db_utils import is_postgresql
+    import catalog
+
+    rapido = request.args.get('mode', 'exact') == 'fast' and is_postgresql()
+    aproximados = []
+
+    total_noticias = _contar(Noticia, Noticia.is_active.is_(True))
+    if rapido:
+        # La estimación cuenta todas las noticias, no solo las activas
+        total_noticias = _estimar('noticias', total_noticias)
+        aproximados.append('total_noticias')
+
+    # Una fila por contador de votos (o una sola fila vacía si no hay votos)
+    # con los totales repetidos como subconsultas escalares
+    una_fila = select(literal(1).label('uno')).subquery()
+    filas = db.session.execute(
+        select(
+            _contar(Candidato),
+            _contar(Pregunta),
+            total_noticias,
+            ConteoVoto.candidato_id,
+            ConteoVoto.votos
+        ).select_from(una_fila.outerjoin(ConteoVoto, true()))
+    ).all()
+
+    votos = {f[3]: f[4] for f in filas if f[3] is not None}
+    nombres = catalog.get_snapshot().candidatos_por_id
+    votos_por_candidato = [
+        {'candidato': nombres[cid].nombre, 'votos': votos[cid]}
+        for cid in sorted(votos) if votos[cid] > 0 and cid in nombres
+    ]
 
     return jsonify({
-        'total_candidatos': total_candidatos,
-        'total_preguntas': total_preguntas,
-        'total_votos': total_votos,
-        'total_noticias': total_noticias,
-        'votos_por_candidato': [{'candidato': v[0], 'votos': v[1]} for v in votos_por_candidato]
+        'total_candidatos': filas[0][0],
+        'total_preguntas': filas[0][1],
+        'total_votos': sum(votos.values()),
+        'total_noticias': filas[0][2],
+        'votos_por_candidato': votos_por_candidato,
+        'mode': 'fast' if rapido else 'exact',
+        'approximate': aproximados
     }), 200
 
+@admin_bp.route('/buffer-votos', methods=['GET'])
+@admin_required
+def get_buffer_votos():
+    """Métricas de la ingesta diferida de votos (tamaño de lote y retraso)"""
+    buffer = current_app.extensions.get('vote_buffer')
+    if not buffer:
+        return jsonify({'mode': 'direct'}), 200
+
+    return jsonify(dict(buffer.stats(), mode='buffered')), 200
+
+@admin_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def get_db_pool():
+    """
+    Uso y tiempos de espera del pool de conexiones del worker que atiende la
+    petición (consulta rápida; todos los workers están en /api/admin/metrics)
+    """
+    import db_pool
+    alcance = {'scope': 'worker', 'all_workers': '/api/admin/metrics'}
+    estado = db_pool.stats(db.engine)
+    if estado is None:
+        return jsonify(dict(alcance, pid=os.getpid(), telemetry=False)), 200
+
+    return jsonify(dict(estado, telemetry=True, **alcance)), 200
+
+@admin_bp.route('/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """Métricas de rendimiento de todos los workers en formato Prometheus"""
+    import metrics
+    data, content_type = metrics.export()
+    return current_app.response_class(data, content_type=content_type)
+
+@admin_bp.route('/ingestion/status', methods=['GET'])
+@admin_required
+def get_ingestion_status():
+    """Estado de la ingesta de noticias (última ejecución, duración, errores)"""
+    import news_ingestion
+    return jsonify(news_ingestion.status()), 200
+
+@admin_bp.route('/export/<nombre>', methods=['GET'])
+@admin_required
+def export_tabla(nombre):
+    """
+    Exporta votos o noticias en streaming (auditoría)
+
+    Query params:
+        format: csv (por defecto) o ndjson
+        desde, hasta: rango ISO 8601 [desde, hasta) sobre timestamp / published_at
+        ronda: solo votos de esa ronda
+        gzip: 1 para comprimir al vuelo (.gz)
+    """
+    import exports
+    from flask import stream_with_context
+
+    if nombre not in exports.EXPORTS:
+        return jsonify({'error': 'Exportación no encontrada'}), 404
+    formato = request.args.get('format', 'csv')
+    if formato not in exports.FORMATOS:
+        return jsonify({'error': 'format debe ser csv o ndjson'}), 400
+
+    filtros = {}
+    for param in ('desde', 'hasta'):
+        valor = request.args.get(param)
+        if valor:
+            try:
+                fecha = datetime.fromisoformat(valor)
+            except ValueError:
+                return jsonify({'error': f'{param} debe ser una fecha ISO 8601'}), 400
+            if fecha.tzinfo:
+                # Las fechas se guardan en UTC sin zona horaria
+                fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+            filtros[param] = fecha
+    if nombre == 'votos' and request.args.get('ronda'):
+        filtros['ronda'] = request.args.get('ronda', type=int)
+        if filtros['ronda'] is None:
+            return jsonify({'error': 'ronda debe ser un número'}), 400
+    comprimir = request.args.get('gzip') in ('1', 'true')
+
+    nombre_archivo = f"{nombre}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{formato}"
+    if comprimir:
+        nombre_archivo += '.gz'
+    return current_app.response_class(
+        stream_with_context(exports.generate(nombre, formato, comprimir=comprimir, **filtros)),
+        content_type='application/gzip' if comprimir else f'{exports.FORMATOS[formato]}; charset=utf-8',
+        headers={
+            'Content-Disposition': f'attachment; filename={nombre_archivo}',
+            # Que nginx no acumule la respuesta completa antes de enviarla
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 # ==================== UTILIDADES ====================
 
 @admin_bp.route('/reset-votes', methods=['POST'])
 @admin_required
 def reset_votes():
-    """Reiniciar todos los votos"""
-    from models import Voto
-    Voto.query.delete()
-    db.session.commit()
+    """Reiniciar los votos de la ronda abierta (las archivadas se conservan)"""
+    import vote_rounds
+    try:
+        ronda = vote_rounds.reset_current()
+        db.session.commit()
+    except OperationalError:
+        db.session.rollback()
+        return jsonify({'error': 'La tabla de votos está en uso (¿exportación en curso?), reintenta'}), 409
+
+    return jsonify({'message': 'Votos reiniciados', 'ronda': ronda}), 200
+
+@admin_bp.route('/rondas', methods=['POST'])
+@admin_required
+def nueva_ronda():
+    """Archivar la ronda abierta y abrir la siguiente"""
+    import vote_rounds
+    try:
+        ronda = vote_rounds.start_new()
+        db.session.commit()
+    except OperationalError:
+        db.session.rollback()
+        return jsonify({'error': 'La tabla de votos está en uso (¿exportación en curso?), reintenta'}), 409
 
-    return jsonify({'message': 'Votos reiniciados'}), 200
+    return jsonify({'message': f'Ronda {ronda} abierta', 'ronda': ronda}), 201
 
 @admin_bp.route('/reset-news', methods=['POST'])
 @admin_required
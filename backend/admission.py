@@ -0,0 +1,194 @@
+"""
+Control de admisión con token buckets compartidos entre workers
+
+Limita las rutas caras de escritura (/api/votar y la actualización de
+noticias) por IP del cliente y en total por ruta. Las peticiones que
+exceden el límite se rechazan con 429 y Retry-After antes de tocar la
+base de datos.
+
+Los buckets viven en un archivo mapeado en memoria (por defecto en
+/dev/shm), así que todos los workers de gunicorn de la máquina comparten
+los mismos contadores. El archivo es una tabla hash de tamaño fijo; si se
+llena, se reutiliza el bucket usado hace más tiempo.
+
+Límites por variables de entorno, con formato "peticiones/segundos":
+    ADMISSION_ENABLED=true
+    ADMISSION_FILE=/dev/shm/encuestas-admission
+    ADMISSION_VOTAR_IP=20/60           por IP
+    ADMISSION_VOTAR_GLOBAL=2000/1      total entre todos los clientes
+    ADMISSION_NOTICIAS_IP=2/60
+    ADMISSION_NOTICIAS_GLOBAL=6/60
+"""
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, request
+
+import metrics
+
+# (hash de la clave, tokens disponibles, última recarga)
+SLOT = struct.Struct('<Qdd')
+SLOTS = 65536
+# Posiciones contiguas que se revisan antes de reutilizar un bucket
+PROBES = 8
+
+LIMITES_POR_DEFECTO = {
+    'votar': {'ip': '20/60', 'global': '2000/1'},
+    'noticias': {'ip': '2/60', 'global': '6/60'},
+}
+
+
+def parse_limit(valor):
+    """'20/60' -> (capacidad, tokens por segundo)"""
+    try:
+        cantidad, segundos = valor.split('/')
+        cantidad, segundos = float(cantidad), float(segundos)
+    except ValueError:
+        raise ValueError(f'Límite inválido: {valor!r} (usar "peticiones/segundos")')
+    if cantidad <= 0 or segundos <= 0:
+        raise ValueError(f'Límite inválido: {valor!r}')
+    return cantidad, cantidad / segundos
+
+
+class BucketTable:
+    """Tabla de token buckets en memoria compartida"""
+
+    def __init__(self, path, slots=SLOTS):
+        self.path = path
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+        self._map = None
+
+    def _ensure_open(self):
+        # Cada worker abre su propio descriptor tras el fork: flock solo
+        # excluye entre descriptores distintos
+        if self._pid == os.getpid():
+            return
+        tamano = self.slots * SLOT.size
+        f = open(self.path, 'a+b')
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.fstat(f.fileno()).st_size != tamano:
+                f.truncate(tamano)
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        self._file = f
+        self._map = mmap.mmap(f.fileno(), tamano)
+        self._pid = os.getpid()
+
+    def take(self, clave, capacidad, tasa):
+        """
+        Consume un token del bucket de `clave`
+
+        Returns:
+            0 si se admite la petición; si no, segundos hasta el próximo token
+        """
+        h = int.from_bytes(hashlib.blake2b(clave.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+        ahora = time.monotonic()
+
+        with self._lock:
+            self._ensure_open()
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                offset, tokens, ultima = self._find(h, ahora, capacidad)
+                tokens = min(capacidad, tokens + (ahora - ultima) * tasa)
+                if tokens >= 1:
+                    SLOT.pack_into(self._map, offset, h, tokens - 1, ahora)
+                    return 0
+                SLOT.pack_into(self._map, offset, h, tokens, ahora)
+                return (1 - tokens) / tasa
+            finally:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _find(self, h, ahora, capacidad):
+        """Devuelve (offset, tokens, última recarga) del bucket, creándolo si no existe"""
+        inicio = h % self.slots
+        libre = None
+        mas_antiguo = None
+        for i in range(PROBES):
+            offset = ((inicio + i) % self.slots) * SLOT.size
+            clave, tokens, ultima = SLOT.unpack_from(self._map, offset)
+            if clave == h:
+                return offset, tokens, ultima
+            if clave == 0 and libre is None:
+                libre = offset
+            if mas_antiguo is None or ultima < mas_antiguo[1]:
+                mas_antiguo = (offset, ultima)
+        # Bucket nuevo (o reutilizado): empieza lleno
+        return (libre if libre is not None else mas_antiguo[0]), capacidad, ahora
+
+
+_table = None
+_limits = {}
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+
+def _get_table():
+    global _table
+    if _table is None:
+        directorio = '/dev/shm' if os.path.isdir('/dev/shm') else '/tmp'
+        _table = BucketTable(os.getenv('ADMISSION_FILE', os.path.join(directorio, 'encuestas-admission')))
+    return _table
+
+
+def _get_limits(ruta):
+    if ruta not in _limits:
+        _limits[ruta] = {
+            alcance: parse_limit(os.getenv(f'ADMISSION_{ruta.upper()}_{alcance.upper()}', valor))
+            for alcance, valor in LIMITES_POR_DEFECTO[ruta].items()
+        }
+    return _limits[ruta]
+
+
+def client_ip():
+    """IP del cliente; detrás de nginx llega en X-Real-IP"""
+    return request.headers.get('X-Real-IP') or request.remote_addr or 'desconocida'
+
+
+def check(ruta):
+    """
+    Aplica los límites de `ruta` a la petición en curso
+
+    Returns:
+        None si se admite; si no, (alcance, segundos de espera)
+    """
+    tabla = _get_table()
+    limites = _get_limits(ruta)
+    claves = (('ip', f'{ruta}:ip:{client_ip()}'), ('global', f'{ruta}:global'))
+    for alcance, clave in claves:
+        capacidad, tasa = limites[alcance]
+        espera = tabla.take(clave, capacidad, tasa)
+        if espera:
+            return alcance, espera
+    return None
+
+
+def limit(ruta):
+    """Decorador: rechaza con 429 las peticiones que exceden los límites de `ruta`"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if _env_bool('ADMISSION_ENABLED', True):
+                rechazo = check(ruta)
+                if rechazo:
+                    alcance, espera = rechazo
+                    metrics.record_shed(ruta, alcance)
+                    response = jsonify({'error': 'Demasiadas solicitudes, intenta nuevamente en unos segundos'})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(max(1, math.ceil(espera)))
+                    return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,90 @@
+"""
+Motor de afinidad del quiz
+
+Mantiene en cada worker la matriz de posiciones de los candidatos
+(candidatos x preguntas) como arreglo de NumPy, y calcula la afinidad de
+todos los candidatos con una sola operación vectorizada. La matriz se
+arma a partir de la foto del catálogo (ver catalog.py) y se rehace cuando
+esta cambia.
+"""
+import threading
+
+import numpy as np
+import catalog
+
+
+class AffinityMatrix:
+    """Posiciones de los candidatos; NaN donde el candidato no respondió"""
+
+    def __init__(self, candidatos, respuestas):
+        self.candidato_ids = [c[0] for c in candidatos]
+        self.nombres = [c[1] for c in candidatos]
+
+        filas = {cid: i for i, cid in enumerate(self.candidato_ids)}
+        self.columnas = {}
+        for _, pregunta_id, _ in respuestas:
+            self.columnas.setdefault(pregunta_id, len(self.columnas))
+
+        self.posiciones = np.full((len(filas), len(self.columnas)), np.nan)
+        # Recorrer en orden inverso para que gane la primera respuesta de cada par
+        for candidato_id, pregunta_id, posicion in reversed(respuestas):
+            if candidato_id in filas and posicion is not None:
+                self.posiciones[filas[candidato_id], self.columnas[pregunta_id]] = posicion
+
+
+_lock = threading.Lock()
+_cache = {'snapshot': None, 'matrix': None}
+
+
+def get_matrix():
+    """Devuelve la matriz vigente, rehaciéndola si cambió el catálogo"""
+    snapshot = catalog.get_snapshot()
+    with _lock:
+        if _cache['matrix'] is None or _cache['snapshot'] is not snapshot:
+            _cache['matrix'] = AffinityMatrix(
+                [(c.id, c.nombre) for c in snapshot.candidatos],
+                snapshot.respuestas
+            )
+            _cache['snapshot'] = snapshot
+        return _cache['matrix']
+
+
+def calcular(respuestas_usuario):
+    """
+    Calcula la afinidad (0-100) de cada candidato con las respuestas del usuario
+
+    Args:
+        respuestas_usuario: [{pregunta_id, posicion}]
+
+    Returns:
+        Lista de {candidato_id, nombre, afinidad} ordenada de mayor a menor
+    """
+    matrix = get_matrix()
+    total_preguntas = len(respuestas_usuario)
+
+    # Preguntas que el catálogo no conoce cuentan en el total pero no suman puntos
+    columnas = []
+    posiciones_usuario = []
+    for resp in respuestas_usuario:
+        columna = matrix.columnas.get(resp['pregunta_id'])
+        if columna is not None:
+            columnas.append(columna)
+            posiciones_usuario.append(resp['posicion'])
+
+    if columnas:
+        # Menor diferencia = mayor afinidad; cada pregunta aporta 0-100 puntos
+        diferencias = np.abs(matrix.posiciones[:, columnas] - np.asarray(posiciones_usuario, dtype=float))
+        puntos = np.nansum((4 - diferencias) * 25, axis=1)
+    else:
+        puntos = np.zeros(len(matrix.candidato_ids))
+
+    afinidades = []
+    for candidato_id, nombre, puntos_candidato in zip(matrix.candidato_ids, matrix.nombres, puntos.tolist()):
+        porcentaje_afinidad = (puntos_candidato / (total_preguntas * 100)) * 100 if total_preguntas > 0 else 0
+        afinidades.append({
+            'candidato_id': candidato_id,
+            'nombre': nombre,
+            'afinidad': round(porcentaje_afinidad, 1)
+        })
+
+    return sorted(afinidades, key=lambda x: x['afinidad'], reverse=True)
@@ -0,0 +1,67 @@
+"""
+Utilidades compartidas por los scripts de benchmarks/
+"""
+import http.client
+import json
+import statistics
+import urllib.parse
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    k = min(len(valores) - 1, int(round(p / 100.0 * (len(valores) - 1))))
+    return valores[k]
+
+
+def resumen(latencias, duracion, errores=0):
+    """Throughput y percentiles (ms) de una lista de latencias"""
+    return {
+        'requests': len(latencias),
+        'errors': errores,
+        'req_s': round(len(latencias) / duracion, 1) if duracion else 0.0,
+        'p50_ms': round(statistics.median(latencias), 1) if latencias else 0.0,
+        'p95_ms': round(percentil(latencias, 95), 1),
+        'p99_ms': round(percentil(latencias, 99), 1),
+        'max_ms': round(max(latencias), 1) if latencias else 0.0,
+    }
+
+
+class ClienteHTTP:
+    """Conexión keep-alive a la API (una por hilo), reconecta si el servidor la cierra"""
+
+    def __init__(self, base_url, timeout=30):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self._conn = None
+
+    def request(self, metodo, path, data=None):
+        """Devuelve (status, body) con body ya decodificado si es JSON"""
+        body = json.dumps(data) if data is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for intento in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request(metodo, path, body=body, headers=headers)
+                resp = self._conn.getresponse()
+                contenido = resp.read()
+            except (http.client.HTTPException, ConnectionError):
+                # Conexión cerrada por el servidor (p. ej. workers sync): un reintento
+                self.close()
+                if intento:
+                    raise
+                continue
+            if resp.getheader('Connection', '').lower() == 'close':
+                self.close()
+            if resp.getheader('Content-Type', '').startswith('application/json') and contenido:
+                return resp.status, json.loads(contenido)
+            return resp.status, contenido
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
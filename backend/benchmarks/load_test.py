@@ -0,0 +1,257 @@
+"""
+Prueba de carga de la API pública
+
+Lanza clientes concurrentes contra un backend ya levantado (gunicorn o
+`python app.py`) con una mezcla de tráfico por escenario y reporta
+throughput y p50/p95/p99 por endpoint. El resultado se guarda en JSON
+para comparar entre commits.
+
+Escenarios:
+    votacion       avalancha de votos en /api/votar (con algo de /api/resultados)
+    resultados     muchos espectadores consultando /api/resultados
+    quiz           envíos a /api/quiz/calcular
+    noticias       navegación de /api/noticias siguiendo next_cursor
+    mixto          mezcla de los anteriores (noche de debate)
+
+Uso (desde backend/, con datos de benchmarks/seed.py):
+    python benchmarks/load_test.py --scenario mixto --clients 32 --duration 60 --output carga.json
+    python benchmarks/load_test.py --scenario mixto --output nuevo.json --compare carga.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.client import HTTPException
+
+from common import ClienteHTTP, resumen
+
+# Peso de cada operación por escenario
+ESCENARIOS = {
+    'votacion': {'votar': 0.9, 'resultados': 0.1},
+    'resultados': {'resultados': 1.0},
+    'quiz': {'quiz': 0.8, 'preguntas': 0.2},
+    'noticias': {'noticias': 1.0},
+    'mixto': {'votar': 0.15, 'resultados': 0.45, 'quiz': 0.15, 'preguntas': 0.05, 'noticias': 0.2},
+}
+
+# Páginas que recorre cada visita a noticias
+PAGINAS_NOTICIAS = 3
+
+
+class Catalogo:
+    """Ids de candidatos y preguntas leídos una vez antes de la carga"""
+
+    def __init__(self, cliente):
+        status, candidatos = cliente.request('GET', '/api/candidatos')
+        if status != 200 or not candidatos:
+            raise SystemExit('No hay candidatos: ejecutar antes benchmarks/seed.py')
+        status, preguntas = cliente.request('GET', '/api/quiz/preguntas')
+        self.candidatos = [c['id'] for c in candidatos]
+        self.preguntas = [p['id'] for p in preguntas] if status == 200 else []
+
+
+def _votar(cliente, rnd, catalogo, medir):
+    medir('votar', 'POST', '/api/votar', {
+        'candidato_id': rnd.choice(catalogo.candidatos),
+        'ip_hash': uuid.uuid4().hex
+    })
+
+
+def _resultados(cliente, rnd, catalogo, medir):
+    medir('resultados', 'GET', '/api/resultados')
+
+
+def _preguntas(cliente, rnd, catalogo, medir):
+    medir('preguntas', 'GET', '/api/quiz/preguntas')
+
+
+def _quiz(cliente, rnd, catalogo, medir):
+    medir('quiz', 'POST', '/api/quiz/calcular', {
+        'respuestas': [{'pregunta_id': p, 'posicion': rnd.randint(1, 5)} for p in catalogo.preguntas]
+    })
+
+
+def _noticias(cliente, rnd, catalogo, medir):
+    path = '/api/noticias?limit=20'
+    for _ in range(PAGINAS_NOTICIAS):
+        body = medir('noticias', 'GET', path)
+        cursor = body.get('next_cursor') if isinstance(body, dict) else None
+        if not cursor:
+            break
+        path = f'/api/noticias?limit=20&cursor={cursor}'
+
+
+OPERACIONES = {
+    'votar': _votar,
+    'resultados': _resultados,
+    'preguntas': _preguntas,
+    'quiz': _quiz,
+    'noticias': _noticias,
+}
+
+
+class Corrida:
+    """Estado compartido de una ejecución (latencias por endpoint)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = {}
+        self.errores = {}
+        self.status = {}
+        self.midiendo = False
+
+    def registrar(self, endpoint, ms, status):
+        if not self.midiendo:
+            return
+        with self._lock:
+            self.latencias.setdefault(endpoint, []).append(ms)
+            clave = f'{endpoint}:{status}'
+            self.status[clave] = self.status.get(clave, 0) + 1
+
+    def error(self, endpoint):
+        if not self.midiendo:
+            return
+        with self._lock:
+            self.errores[endpoint] = self.errores.get(endpoint, 0) + 1
+
+
+def cliente(base_url, escenario, catalogo, corrida, fin, semilla):
+    rnd = random.Random(semilla)
+    http = ClienteHTTP(base_url)
+    nombres = list(escenario)
+    pesos = [escenario[n] for n in nombres]
+
+    def medir(endpoint, metodo, path, data=None):
+        inicio = time.perf_counter()
+        try:
+            status, body = http.request(metodo, path, data)
+        except (OSError, HTTPException):
+            # Timeout o conexión cortada tras el reintento: se cuenta como
+            # error y la próxima petición abre una conexión nueva
+            http.close()
+            corrida.error(endpoint)
+            return None
+        ms = (time.perf_counter() - inicio) * 1000
+        # 403 en votar es un votante repetido: respuesta válida, no un error
+        if status >= 500 or (status >= 400 and status != 403):
+            corrida.error(endpoint)
+        else:
+            corrida.registrar(endpoint, ms, status)
+        return body
+
+    try:
+        while time.time() < fin:
+            operacion = OPERACIONES[rnd.choices(nombres, weights=pesos)[0]]
+            operacion(http, rnd, catalogo, medir)
+    finally:
+        http.close()
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(args):
+    escenario = ESCENARIOS[args.scenario]
+    catalogo = Catalogo(ClienteHTTP(args.base_url))
+    corrida = Corrida()
+
+    fin = time.time() + args.warmup + args.duration
+    hilos = [
+        threading.Thread(target=cliente, args=(args.base_url, escenario, catalogo, corrida, fin, args.seed + i))
+        for i in range(args.clients)
+    ]
+    inicio = datetime.utcnow()
+    for h in hilos:
+        h.start()
+
+    # Las mediciones empiezan tras el calentamiento (cachés, pool de conexiones)
+    time.sleep(args.warmup)
+    corrida.midiendo = True
+    for h in hilos:
+        h.join()
+
+    endpoints = {
+        nombre: resumen(corrida.latencias.get(nombre, []), args.duration, corrida.errores.get(nombre, 0))
+        for nombre in sorted(set(corrida.latencias) | set(corrida.errores))
+    }
+    todas = [ms for lat in corrida.latencias.values() for ms in lat]
+    return {
+        'scenario': args.scenario,
+        'started_at': inicio.isoformat(),
+        'git_commit': _git_commit(),
+        'base_url': args.base_url,
+        'params': {
+            'clients': args.clients,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'mix': escenario,
+        },
+        'total': resumen(todas, args.duration, sum(corrida.errores.values())),
+        'endpoints': endpoints,
+        'status_codes': corrida.status,
+    }
+
+
+def _delta(nuevo, anterior):
+    if not anterior:
+        return ''
+    return f'{(nuevo - anterior) / anterior * 100:+.0f}%'
+
+
+def imprimir(resultado, anterior=None):
+    print(f"\nEscenario {resultado['scenario']} ({resultado['params']['clients']} clientes, "
+          f"{resultado['params']['duration']}s, commit {resultado['git_commit']})")
+    print(f"{'endpoint':12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}"
+          + (f" {'Δ req/s':>8} {'Δ p95':>8}" if anterior else ''))
+
+    filas = list(resultado['endpoints'].items()) + [('TOTAL', resultado['total'])]
+    for nombre, m in filas:
+        linea = f"{nombre:12} {m['req_s']:>8} {m['p50_ms']:>8} {m['p95_ms']:>8} {m['p99_ms']:>8} {m['errors']:>8}"
+        if anterior:
+            previo = anterior['total'] if nombre == 'TOTAL' else anterior['endpoints'].get(nombre)
+            if previo:
+                linea += f" {_delta(m['req_s'], previo['req_s']):>8} {_delta(m['p95_ms'], previo['p95_ms']):>8}"
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--scenario', choices=sorted(ESCENARIOS), default='mixto')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=int, default=30, help='segundos medidos')
+    parser.add_argument('--warmup', type=int, default=5, help='segundos de calentamiento sin medir')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='archivo JSON donde guardar el resultado')
+    parser.add_argument('--compare', help='resultado JSON anterior con el que comparar')
+    args = parser.parse_args()
+
+    anterior = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            anterior = json.load(f)
+
+    resultado = ejecutar(args)
+    imprimir(resultado, anterior)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f'\nResultado guardado en {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Datos sintéticos para pruebas de carga
+
+Carga candidatos, preguntas (con la posición de cada candidato), noticias y
+votos a la escala indicada en la base de datos de DATABASE_URL (PostgreSQL
+local o SQLite). Los datos son reproducibles para una misma --seed.
+
+Uso (desde backend/, con el venv activado):
+    python benchmarks/seed.py --candidatos 8 --preguntas 30 --votos 1000000 --noticias 5000 --yes
+
+¡Atención! Borra candidatos, preguntas, votos y noticias existentes.
+Usar solo contra una base de datos de pruebas.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from models import db, Candidato, ConteoVoto, Voto, Pregunta, RespuestaCandidato, Noticia
+import content_version
+import tally
+
+LOTE = 10000
+CATEGORIAS = ['Economía', 'Educación', 'Salud', 'Seguridad', 'Pensiones', 'Medio Ambiente']
+FUENTES = ['biobio', 'emol', 'latercera', 'cooperativa', 'elmostrador']
+
+
+def _insertar(tabla, filas):
+    for i in range(0, len(filas), LOTE):
+        db.session.execute(tabla.insert(), filas[i:i + LOTE])
+
+
+def limpiar():
+    for modelo in (RespuestaCandidato, Voto, ConteoVoto, Candidato, Pregunta, Noticia):
+        db.session.query(modelo).delete()
+    db.session.commit()
+
+
+def sembrar_catalogo(rnd, n_candidatos, n_preguntas):
+    _insertar(Candidato.__table__, [{
+        'nombre': f'Candidato {i}',
+        'partido': f'Partido {i}',
+        'foto_url': f'/images/candidato{i}.jpg',
+        'biografia': f'Biografía sintética del candidato {i}. ' * 20,
+        'programa': {c: f'Propuesta de {c.lower()} del candidato {i}' for c in CATEGORIAS},
+        'linea_tiempo': [{'year': 2000 + j, 'evento': f'Hito {j}'} for j in range(10)],
+    } for i in range(1, n_candidatos + 1)])
+
+    _insertar(Pregunta.__table__, [{
+        'texto': f'Pregunta sintética {i}',
+        'categoria': CATEGORIAS[i % len(CATEGORIAS)],
+        'orden': i,
+    } for i in range(1, n_preguntas + 1)])
+
+    # Ids asignados por la base de datos (las secuencias siguen siendo válidas)
+    candidato_ids = [c[0] for c in db.session.query(Candidato.id).order_by(Candidato.id)]
+    pregunta_ids = [p[0] for p in db.session.query(Pregunta.id).order_by(Pregunta.id)]
+    _insertar(RespuestaCandidato.__table__, [{
+        'pregunta_id': pregunta_id,
+        'candidato_id': candidato_id,
+        'posicion': rnd.randint(1, 5),
+    } for pregunta_id in pregunta_ids for candidato_id in candidato_ids])
+    db.session.commit()
+    return candidato_ids
+
+
+def sembrar_votos(rnd, n_votos, ids, dias):
+    # Distribución desigual entre candidatos, como en una elección real
+    pesos = [rnd.random() ** 2 + 0.05 for _ in ids]
+    ahora = datetime.utcnow()
+    segundos = dias * 86400
+
+    for inicio in range(0, n_votos, LOTE):
+        fin = min(inicio + LOTE, n_votos)
+        elegidos = rnd.choices(ids, weights=pesos, k=fin - inicio)
+        filas = [{
+            'candidato_id': candidato_id,
+            'ip_hash': f'seed-{inicio + k:012d}',
+            'timestamp': ahora - timedelta(seconds=rnd.randrange(segundos)),
+        } for k, candidato_id in enumerate(elegidos)]
+        db.session.execute(Voto.__table__.insert(), filas)
+        db.session.commit()
+        if fin % (LOTE * 50) == 0 or fin == n_votos:
+            print(f'  votos: {fin}/{n_votos}')
+
+
+def sembrar_noticias(rnd, n_noticias, dias):
+    ahora = datetime.utcnow()
+    filas = [{
+        'title': f'Noticia sintética {i}',
+        'url': f'https://example.invalid/noticias/{i}',
+        'summary': 'Resumen sintético de la noticia. ' * 5,
+        'published_at': ahora - timedelta(seconds=rnd.randrange(dias * 86400)),
+        'source': FUENTES[i % len(FUENTES)].capitalize(),
+        'source_id': FUENTES[i % len(FUENTES)],
+        'created_at': ahora,
+        'is_active': True,
+    } for i in range(n_noticias)]
+    _insertar(Noticia.__table__, filas)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidatos', type=int, default=8)
+    parser.add_argument('--preguntas', type=int, default=30)
+    parser.add_argument('--votos', type=int, default=100000)
+    parser.add_argument('--noticias', type=int, default=2000)
+    parser.add_argument('--dias', type=int, default=30, help='antigüedad máxima de votos y noticias')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--yes', action='store_true', help='confirmar el borrado de los datos existentes')
+    args = parser.parse_args()
+
+    if not args.yes:
+        parser.error('este script borra los datos de DATABASE_URL; confirmar con --yes')
+
+    rnd = random.Random(args.seed)
+    inicio = time.time()
+    with app.app_context():
+        db.create_all()
+        limpiar()
+        print('Sembrando catálogo...')
+        candidato_ids = sembrar_catalogo(rnd, args.candidatos, args.preguntas)
+        print('Sembrando votos...')
+        sembrar_votos(rnd, args.votos, candidato_ids, args.dias)
+        print('Sembrando noticias...')
+        sembrar_noticias(rnd, args.noticias, args.dias)
+
+        # Contadores y versiones de caché coherentes con los datos nuevos
+        content_version.bump(content_version.CATALOGO)
+        tally.reconcile()
+
+    print(f'Listo en {time.time() - inicio:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark de modos de worker de gunicorn (sync, gthread, gevent)
+
+Levanta gunicorn con cada modo sobre la base de datos de DATABASE_URL,
+reinicia los datos de ejemplo (POST /api/init-db) y lanza clientes
+concurrentes contra /api/votar (escritura) y /api/resultados (lectura).
+
+Uso (desde backend/, con el venv activado):
+    python benchmarks/worker_modes.py --modes sync,gthread,gevent --clients 32 --duration 20
+
+¡Atención! Borra los votos y candidatos de la base de datos configurada.
+Usar solo contra una base de datos de pruebas.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from common import resumen
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peticion(url, data=None):
+    body = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def esperar_servidor(base, proceso, timeout=30):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError('gunicorn terminó al iniciar')
+        try:
+            if peticion(base + '/api/health') == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('gunicorn no respondió a tiempo')
+
+
+def cliente(base, fin, candidatos, proporcion_votos, resultados, indice):
+    latencias = {'votar': [], 'resultados': []}
+    errores = 0
+    n = 0
+    while time.time() < fin:
+        n += 1
+        inicio = time.perf_counter()
+        try:
+            if n % 100 < proporcion_votos * 100:
+                endpoint = 'votar'
+                status = peticion(base + '/api/votar', {
+                    'candidato_id': candidatos[n % len(candidatos)],
+                    'ip_hash': uuid.uuid4().hex
+                })
+            else:
+                endpoint = 'resultados'
+                status = peticion(base + '/api/resultados')
+        except (OSError, http.client.HTTPException):
+            errores += 1
+            continue
+        if status >= 400:
+            errores += 1
+            continue
+        latencias[endpoint].append((time.perf_counter() - inicio) * 1000)
+    resultados[indice] = (latencias, errores)
+
+
+def medir_modo(modo, args):
+    base = f'http://127.0.0.1:{args.port}'
+    # Todos los clientes salen de la misma IP: sin control de admisión (ver admission.py)
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=modo, ADMISSION_ENABLED='false')
+    if args.workers:
+        env['GUNICORN_WORKERS'] = str(args.workers)
+
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py',
+         '--bind', f'127.0.0.1:{args.port}',
+         '--access-logfile', '/dev/null', '--error-logfile', '-',
+         'app:app'],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        esperar_servidor(base, proceso)
+        peticion(base + '/api/init-db', {})
+        with urllib.request.urlopen(base + '/api/candidatos') as resp:
+            candidatos = [c['id'] for c in json.loads(resp.read())]
+
+        fin = time.time() + args.duration
+        resultados = [None] * args.clients
+        hilos = [
+            threading.Thread(target=cliente, args=(base, fin, candidatos, args.write_ratio, resultados, i))
+            for i in range(args.clients)
+        ]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    fila = {'modo': modo, 'errores': sum(r[1] for r in resultados)}
+    for endpoint in ('votar', 'resultados'):
+        lat = [x for r in resultados for x in r[0][endpoint]]
+        fila[endpoint] = resumen(lat, args.duration)
+    return fila
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='sync,gthread,gevent')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=int, default=20, help='segundos por modo')
+    parser.add_argument('--workers', type=int, default=None, help='GUNICORN_WORKERS (por defecto el de la config)')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='fracción de peticiones que son votos')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--json', action='store_true', help='imprimir resultados en JSON')
+    args = parser.parse_args()
+
+    filas = [medir_modo(modo.strip(), args) for modo in args.modes.split(',')]
+
+    if args.json:
+        print(json.dumps(filas, indent=2))
+        return
+
+    print(f"\n{'modo':8} {'endpoint':11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for fila in filas:
+        for endpoint in ('votar', 'resultados'):
+            m = fila[endpoint]
+            print(f"{fila['modo']:8} {endpoint:11} {m['req_s']:>8} {m['p50_ms']:>8} {m['p95_ms']:>8} {m['p99_ms']:>8}")
+        if fila['errores']:
+            print(f"{fila['modo']:8} errores: {fila['errores']}")
+
+
+if __name__ == '__main__':
+    main()
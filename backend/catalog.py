@@ -0,0 +1,66 @@
+"""
+Foto del catálogo en memoria
+
+Candidatos, preguntas y posiciones de los candidatos son pocos y casi
+nunca cambian, así que cada worker guarda una copia inmutable y las rutas
+públicas la leen sin consultar esas tablas. La copia se recarga solo
+cuando cambia la versión 'catalogo' (ver content_version.py), que todas
+las rutas admin que modifican el catálogo incrementan.
+"""
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+from models import db, Candidato, Pregunta, RespuestaCandidato
+import content_version
+
+CandidatoFoto = namedtuple('CandidatoFoto', [
+    'id', 'nombre', 'partido', 'foto_url', 'biografia', 'programa', 'linea_tiempo'
+])
+PreguntaFoto = namedtuple('PreguntaFoto', ['id', 'texto', 'categoria', 'orden'])
+
+
+class CatalogSnapshot:
+    """Copia de solo lectura del catálogo en una versión dada"""
+
+    def __init__(self, version, candidatos, preguntas, respuestas):
+        self.version = version
+        self.candidatos = tuple(candidatos)    # ordenados por id
+        self.preguntas = tuple(preguntas)      # ordenadas por orden
+        self.respuestas = tuple(respuestas)    # (candidato_id, pregunta_id, posicion)
+        self.candidatos_por_id = MappingProxyType({c.id: c for c in self.candidatos})
+
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def _load(version):
+    columnas = [getattr(Candidato, f) for f in CandidatoFoto._fields]
+    candidatos = [CandidatoFoto(*f) for f in db.session.query(*columnas).order_by(Candidato.id)]
+
+    preguntas = [PreguntaFoto(*f) for f in db.session.query(
+        Pregunta.id, Pregunta.texto, Pregunta.categoria, Pregunta.orden
+    ).order_by(Pregunta.orden, Pregunta.id)]
+
+    respuestas = [tuple(f) for f in db.session.query(
+        RespuestaCandidato.candidato_id,
+        RespuestaCandidato.pregunta_id,
+        RespuestaCandidato.posicion
+    ).order_by(RespuestaCandidato.id)]
+
+    return CatalogSnapshot(version, candidatos, preguntas, respuestas)
+
+
+def get_snapshot():
+    """Devuelve la foto vigente, recargándola si cambió la versión del catálogo"""
+    global _snapshot
+    version = content_version.get_cached(content_version.CATALOGO)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _load(version)
+        return _snapshot
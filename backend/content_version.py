@@ -0,0 +1,66 @@
+"""
+Versiones del contenido editable desde el panel admin
+
+Cada ruta admin que modifica datos incrementa la versión correspondiente
+en la misma transacción. Los workers de gunicorn comparan la versión
+(una lectura por clave primaria) para saber si sus cachés locales siguen
+vigentes, sin necesidad de un canal de invalidación entre procesos.
+
+Claves usadas:
+    'catalogo' - candidatos, preguntas y respuestas de candidatos
+    'config'   - configuración general del sitio
+
+`get_cached` memoriza la versión en el proceso durante CONTENT_VERSION_TTL
+segundos, para que las rutas más leídas no consulten la base de datos en
+cada petición. Un cambio hecho en otro worker se ve, como máximo, con ese
+retraso.
+"""
+import os
+import threading
+import time
+
+from models import db, VersionContenido
+from db_utils import dialect_insert
+
+CATALOGO = 'catalogo'
+CONFIG = 'config'
+
+VERSION_TTL = float(os.getenv('CONTENT_VERSION_TTL', 1.0))
+
+_memo_lock = threading.Lock()
+_memo = {}  # {nombre: (version, expira_en)}
+
+
+def bump(nombre):
+    """Incrementa la versión dentro de la transacción actual (sin commit)"""
+    tabla = VersionContenido.__table__
+    stmt = dialect_insert(tabla).values(nombre=nombre, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tabla.c.nombre],
+        set_={'version': tabla.c.version + 1}
+    )
+    db.session.execute(stmt)
+
+    # Este worker no debe seguir usando la versión memorizada
+    with _memo_lock:
+        _memo.pop(nombre, None)
+
+
+def get(nombre):
+    """Obtiene la versión actual (0 si nunca se ha modificado)"""
+    version = db.session.query(VersionContenido.version).filter_by(nombre=nombre).scalar()
+    return version or 0
+
+
+def get_cached(nombre):
+    """Como get(), pero memorizada en el proceso durante VERSION_TTL segundos"""
+    ahora = time.monotonic()
+    with _memo_lock:
+        memo = _memo.get(nombre)
+    if memo and memo[1] > ahora:
+        return memo[0]
+
+    version = get(nombre)
+    with _memo_lock:
+        _memo[nombre] = (version, ahora + VERSION_TTL)
+    return version
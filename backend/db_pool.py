@@ -0,0 +1,174 @@
+"""
+Pool de conexiones de SQLAlchemy y su telemetría por worker
+
+Las opciones del engine se leen de variables de entorno:
+    DB_POOL_SIZE               conexiones fijas por worker   (ver worker_settings.py)
+    DB_MAX_OVERFLOW            conexiones extra en picos     (ver worker_settings.py)
+    DB_POOL_TIMEOUT=30         segundos esperando una conexión libre antes de fallar
+    DB_POOL_RECYCLE=1800       segundos antes de renovar una conexión
+    DB_POOL_PRE_PING=true      comprobar la conexión antes de usarla (reinicios de Postgres)
+    DB_STATEMENT_TIMEOUT_MS    statement_timeout de PostgreSQL (sin límite si no se define)
+
+TimedQueuePool mide cuánto espera cada checkout y cuántas conexiones hay en
+uso, para dimensionar el pool frente a `workers` en gunicorn_config.py. Las
+mediciones van a las métricas de Prometheus (`encuestas_db_pool_*`, con
+todos los workers) y a PoolTelemetry (solo este worker, para
+GET /api/admin/db-pool).
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+import metrics
+import worker_settings
+
+# Últimas esperas de checkout usadas para el percentil 95
+WAIT_SAMPLES = 1000
+
+
+class PoolTelemetry:
+    """Contadores del pool de este worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidated = 0
+        self.saturated_checkouts = 0
+        self.peak_in_use = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+
+    def _check_pid(self):
+        # Tras el fork de gunicorn cada worker empieza con sus propios contadores
+        if self._pid != os.getpid():
+            self._reset()
+
+    def record_checkout(self, pool, wait_ms):
+        with self._lock:
+            self._check_pid()
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self._waits.append(wait_ms)
+            en_uso = pool.checkedout()
+            self.peak_in_use = max(self.peak_in_use, en_uso)
+            if en_uso > pool.size():
+                # El pool fijo estaba agotado: se usó desborde o hubo que esperar
+                self.saturated_checkouts += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self._check_pid()
+            self.timeouts += 1
+
+    def record_invalidated(self):
+        with self._lock:
+            self._check_pid()
+            self.invalidated += 1
+
+    def snapshot(self, pool):
+        with self._lock:
+            self._check_pid()
+            esperas = sorted(self._waits)
+            p95 = esperas[int(0.95 * (len(esperas) - 1))] if esperas else 0.0
+            capacidad = pool.size() + max(pool._max_overflow, 0)
+            en_uso = pool.checkedout()
+            return {
+                'pid': os.getpid(),
+                'pool_size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'capacity': capacidad,
+                'in_use': en_uso,
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'peak_in_use': self.peak_in_use,
+                'saturation': round(en_uso / capacidad, 3) if capacidad else 0.0,
+                'peak_saturation': round(self.peak_in_use / capacidad, 3) if capacidad else 0.0,
+                'checkouts': self.checkouts,
+                'saturated_checkouts': self.saturated_checkouts,
+                'timeouts': self.timeouts,
+                'invalidated': self.invalidated,
+                'wait_avg_ms': round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_p95_ms': round(p95, 3),
+                'wait_max_ms': round(self.wait_max_ms, 3),
+            }
+
+
+telemetry = PoolTelemetry()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que registra el tiempo de espera de cada checkout"""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            entrada = super()._do_get()
+        except exc.TimeoutError:
+            telemetry.record_timeout()
+            metrics.record_pool_timeout()
+            raise
+        espera = time.perf_counter() - inicio
+        telemetry.record_checkout(self, espera * 1000)
+        metrics.record_pool_checkout(espera, self.checkedout() > self.size())
+        self._publicar_estado()
+        return entrada
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._publicar_estado()
+
+    def _publicar_estado(self):
+        capacidad = self.size() + max(self._max_overflow, 0)
+        metrics.record_pool_state(self.size(), self.checkedout(), max(self.overflow(), 0), capacidad)
+
+
+@event.listens_for(TimedQueuePool, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    # Conexiones descartadas (pre-ping fallido, Postgres reiniciado, etc.)
+    telemetry.record_invalidated()
+    metrics.record_pool_invalidated()
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+
+def engine_options(database_url):
+    """Opciones de SQLALCHEMY_ENGINE_OPTIONS para este worker"""
+    if database_url.startswith('sqlite'):
+        # SQLite (desarrollo) usa el pool por defecto de SQLAlchemy
+        return {}
+
+    pool_size, max_overflow = worker_settings.db_pool_limits()
+    opciones = {
+        'poolclass': TimedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+    statement_timeout = os.getenv('DB_STATEMENT_TIMEOUT_MS')
+    if statement_timeout and database_url.startswith('postgresql'):
+        opciones['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout)}'}
+
+    return opciones
+
+
+def stats(engine):
+    """Estado del pool de este worker, o None si no usa TimedQueuePool"""
+    if not isinstance(engine.pool, TimedQueuePool):
+        return None
+    return telemetry.snapshot(engine.pool)
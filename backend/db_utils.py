@@ -0,0 +1,22 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+
+def dialect_insert(table):
+    """
+    Devuelve un INSERT con soporte de ON CONFLICT según el motor en uso
+
+    PostgreSQL en producción y SQLite en desarrollo/pruebas comparten la
+    misma API (on_conflict_do_nothing / on_conflict_do_update).
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f'Motor de base de datos no soportado: {dialect}')
+
+
+def is_postgresql():
+    """Indica si la sesión actual está conectada a PostgreSQL"""
+    return db.session.get_bind().dialect.name == 'postgresql'
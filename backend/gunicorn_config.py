@@ -1,13 +1,24 @@
-import multiprocessing
+import os
+import sys
+
+# Permite importar worker_settings.py sin importar desde dónde se lance gunicorn
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import worker_settings
 
 # Dirección y puerto
-bind = "127.0.0.1:5000"
+bind = os.getenv('GUNICORN_BIND', "127.0.0.1:5000")
 
 # Número de workers (recomendado: 2-4 x número de CPUs)
-workers = multiprocessing.cpu_count() * 2 + 1
+workers = worker_settings.workers()
 
-# Tipo de worker
-worker_class = "sync"
+# Tipo de worker (GUNICORN_WORKER_CLASS): sync, gthread o gevent.
+# gevent (por defecto) atiende muchas conexiones por proceso, incluidos los
+# clientes de /api/resultados/stream (SSE), con una latencia de votar igual
+# a sync en el benchmark; en gthread cada cliente SSE ocupa un hilo.
+# Ver worker_settings.py y la sección "Modos de worker" del README.
+worker_class = worker_settings.worker_class()
+threads = worker_settings.threads()
+worker_connections = worker_settings.worker_connections()
 
 # Timeout
 timeout = 120
@@ -23,3 +34,32 @@ max_requests_jitter = 50
 
 # Daemon
 daemon = False
+
+# Métricas de Prometheus compartidas entre workers (ver metrics.py).
+# Debe definirse antes de que los workers importen prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/var/lib/encuestas/metrics')
+
+# Se importa aquí y no en child_exit: varios workers que terminan a la vez
+# importarían el módulo en paralelo y podrían verlo a medio inicializar
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def on_starting(server):
+    # Descartar métricas de una ejecución anterior
+    directorio = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    os.makedirs(directorio, exist_ok=True)
+    for nombre in os.listdir(directorio):
+        if nombre.endswith('.db'):
+            os.remove(os.path.join(directorio, nombre))
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent' and os.getenv('DATABASE_URL', 'postgresql').startswith('postgresql'):
+        # psycopg2 es una librería C bloqueante: sin este parche una consulta
+        # lenta bloquea todas las conexiones del worker
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Proceso de ingesta de noticias (separado de los workers de gunicorn)
+
+Ejecuta el scraper cada NEWS_INGESTION_INTERVAL_MIN minutos y atiende las
+solicitudes encoladas desde POST /api/noticias/actualizar cada
+NEWS_INGESTION_POLL_SEC segundos.
+
+Uso:
+    python ingestion_worker.py
+"""
+import os
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from datetime import datetime
+
+from app import app
+import news_ingestion
+
+POLL_SECONDS = int(os.getenv('NEWS_INGESTION_POLL_SEC', 10))
+
+
+def ejecutar_programada():
+    with app.app_context():
+        ejecucion = news_ingestion.run(trigger='programada')
+        _log(ejecucion)
+
+
+def ejecutar_pendientes():
+    with app.app_context():
+        ejecucion = news_ingestion.run_pending()
+        if ejecucion:
+            _log(ejecucion)
+
+
+def _log(ejecucion):
+    if ejecucion is None:
+        print("Ingesta omitida: otra ejecución está en curso")
+        return
+    print(f"Ingesta {ejecucion.id} ({ejecucion.trigger}): {ejecucion.status}, "
+          f"{ejecucion.nuevas or 0} nuevas de {ejecucion.total_scraped or 0}")
+
+
+if __name__ == '__main__':
+    scheduler = BlockingScheduler()
+    scheduler.add_job(
+        ejecutar_programada, 'interval',
+        minutes=news_ingestion.INTERVAL_MINUTES,
+        next_run_time=datetime.now(),
+        max_instances=1, coalesce=True
+    )
+    scheduler.add_job(
+        ejecutar_pendientes, 'interval',
+        seconds=POLL_SECONDS,
+        max_instances=1, coalesce=True
+    )
+
+    print(f"🗞️  Ingesta de noticias cada {news_ingestion.INTERVAL_MINUTES} min")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
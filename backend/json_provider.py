@@ -0,0 +1,41 @@
+"""
+Serialización JSON con orjson
+
+Reemplaza el proveedor JSON de Flask para que `jsonify` (y por lo tanto
+las respuestas que guarda response_cache.py) se codifiquen con orjson,
+bastante más rápido que el módulo json estándar. Los tipos que orjson no
+conoce (Decimal, objetos con __html__, etc.) se delegan al proveedor por
+defecto de Flask.
+"""
+import time
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+import metrics
+
+# Claves ordenadas (igual que Flask) y claves no-string permitidas
+OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask basado en orjson"""
+
+    def dumps(self, obj, **kwargs):
+        inicio = time.perf_counter()
+        data = orjson.dumps(obj, default=self.default, option=OPTIONS).decode('utf-8')
+        metrics.record_serialization(time.perf_counter() - inicio)
+        return data
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = OPTIONS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        inicio = time.perf_counter()
+        data = orjson.dumps(obj, default=self.default, option=option)
+        metrics.record_serialization(time.perf_counter() - inicio)
+        return self._app.response_class(data, mimetype=self.mimetype)
@@ -0,0 +1,61 @@
+"""
+Bloqueos distribuidos simples sobre la base de datos
+
+Un bloqueo es una fila en `bloqueos` con dueño y fecha de expiración.
+Adquirirlo es un UPDATE condicional (solo si está libre o expirado), así
+que funciona igual entre workers de gunicorn, procesos separados o
+servidores distintos. La expiración evita que un proceso caído lo retenga
+para siempre.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from models import db, Bloqueo
+from db_utils import dialect_insert
+
+
+def acquire(nombre, ttl):
+    """
+    Intenta adquirir el bloqueo sin esperar (hace commit)
+
+    Args:
+        nombre: Identificador del bloqueo
+        ttl: Segundos tras los cuales el bloqueo expira si no se libera
+
+    Returns:
+        Token del dueño si se adquirió, None si otro proceso lo tiene
+    """
+    owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+    ahora = datetime.utcnow()
+
+    db.session.execute(
+        dialect_insert(Bloqueo.__table__).values(nombre=nombre).on_conflict_do_nothing()
+    )
+    result = db.session.execute(
+        update(Bloqueo)
+        .where(Bloqueo.nombre == nombre)
+        .where(or_(Bloqueo.owner.is_(None), Bloqueo.expires_at < ahora))
+        .values(owner=owner, expires_at=ahora + timedelta(seconds=ttl))
+    )
+    db.session.commit()
+
+    return owner if result.rowcount == 1 else None
+
+
+def release(nombre, owner):
+    """Libera el bloqueo si todavía pertenece a `owner` (hace commit)"""
+    db.session.execute(
+        update(Bloqueo)
+        .where(Bloqueo.nombre == nombre, Bloqueo.owner == owner)
+        .values(owner=None, expires_at=None)
+    )
+    db.session.commit()
+
+
+def is_held(nombre):
+    """Indica si el bloqueo está tomado y vigente"""
+    bloqueo = db.session.get(Bloqueo, nombre)
+    return bool(bloqueo and bloqueo.owner and bloqueo.expires_at and bloqueo.expires_at >= datetime.utcnow())
@@ -0,0 +1,254 @@
+"""
+Métricas de rendimiento por endpoint
+
+Por cada request se mide la latencia total, el número y tiempo de las
+consultas SQL (eventos de SQLAlchemy) y el tiempo de serialización JSON.
+Los valores se envían en la cabecera `Server-Timing` y se acumulan en
+métricas de Prometheus que publica GET /api/admin/metrics.
+
+Con varios workers de gunicorn se usa el modo multiproceso de
+prometheus_client: cada worker escribe sus métricas en PROMETHEUS_MULTIPROC_DIR
+(gunicorn_config.py lo define y lo limpia al arrancar) y el endpoint las suma.
+"""
+import os
+import time
+
+from flask import g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    'encuestas_request_duration_seconds',
+    'Latencia de las peticiones HTTP',
+    ['endpoint', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+SQL_QUERIES = Histogram(
+    'encuestas_request_sql_queries',
+    'Consultas SQL por petición',
+    ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+SQL_DURATION = Histogram(
+    'encuestas_request_sql_duration_seconds',
+    'Tiempo en consultas SQL por petición',
+    ['endpoint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+SERIALIZATION_DURATION = Histogram(
+    'encuestas_request_serialization_duration_seconds',
+    'Tiempo serializando JSON por petición',
+    ['endpoint'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+)
+ADMISSION_SHED = Counter(
+    'encuestas_admission_shed',
+    'Peticiones rechazadas con 429 por el control de admisión',
+    ['route', 'scope']
+)
+
+# Ingesta diferida de votos (vote_buffer.py); GET /api/admin/buffer-votos
+# muestra los mismos datos solo para el worker que atiende la petición
+VOTE_BUFFER_PENDING = Gauge(
+    'encuestas_vote_buffer_pending',
+    'Votos confirmados en el spool y pendientes de volcar',
+    multiprocess_mode='livesum'
+)
+VOTE_BUFFER_BATCH = Histogram(
+    'encuestas_vote_buffer_batch_size',
+    'Votos por lote volcado a la base de datos',
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500)
+)
+VOTE_BUFFER_LAG = Histogram(
+    'encuestas_vote_buffer_lag_seconds',
+    'Retraso entre la confirmación del voto más antiguo del lote y su volcado',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+VOTE_BUFFER_FLUSHED = Counter(
+    'encuestas_vote_buffer_flushed_votes',
+    'Votos del buffer insertados en la base de datos'
+)
+VOTE_BUFFER_DROPPED = Counter(
+    'encuestas_vote_buffer_dropped_votes',
+    'Votos del buffer descartados al volcar',
+    ['reason']
+)
+VOTE_BUFFER_ERRORS = Counter(
+    'encuestas_vote_buffer_flush_errors',
+    'Volcados o recuperaciones de spool fallidos (se reintentan)'
+)
+VOTE_BUFFER_RECOVERED = Counter(
+    'encuestas_vote_buffer_recovered_spools',
+    'Spools de workers caídos volcados por otro worker'
+)
+
+# Pool de conexiones (db_pool.py). Los gauges llevan la etiqueta pid de cada
+# worker vivo, para comparar el uso de todos contra workers x pool_size;
+# GET /api/admin/db-pool solo muestra el worker que atiende la petición
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'encuestas_db_pool_checkout_wait_seconds',
+    'Espera por una conexión libre del pool en cada checkout',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+)
+DB_POOL_SIZE = Gauge(
+    'encuestas_db_pool_size',
+    'Conexiones fijas del pool (pool_size)',
+    multiprocess_mode='liveall'
+)
+DB_POOL_IN_USE = Gauge(
+    'encuestas_db_pool_in_use',
+    'Conexiones del pool en uso',
+    multiprocess_mode='liveall'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'encuestas_db_pool_overflow',
+    'Conexiones de desborde abiertas (más allá de pool_size)',
+    multiprocess_mode='liveall'
+)
+DB_POOL_SATURATION = Gauge(
+    'encuestas_db_pool_saturation',
+    'Conexiones en uso / (pool_size + max_overflow)',
+    multiprocess_mode='liveall'
+)
+DB_POOL_SATURATED_CHECKOUTS = Counter(
+    'encuestas_db_pool_saturated_checkouts',
+    'Checkouts con el pool fijo agotado (desborde o espera)'
+)
+DB_POOL_TIMEOUTS = Counter(
+    'encuestas_db_pool_timeouts',
+    'Checkouts que superaron DB_POOL_TIMEOUT'
+)
+DB_POOL_INVALIDATED = Counter(
+    'encuestas_db_pool_invalidated',
+    'Conexiones descartadas por el pool (pre-ping fallido, reinicio de la base)'
+)
+
+
+def record_shed(ruta, alcance):
+    """Cuenta una petición rechazada por admission.py"""
+    ADMISSION_SHED.labels(ruta, alcance).inc()
+
+
+def record_buffer_pending(pendientes):
+    VOTE_BUFFER_PENDING.set(pendientes)
+
+
+def record_buffer_flush(votos, retraso):
+    """Registra un lote volcado por vote_buffer.py (retraso en segundos)"""
+    VOTE_BUFFER_BATCH.observe(votos)
+    VOTE_BUFFER_LAG.observe(retraso)
+
+
+def record_buffer_persisted(insertados, duplicados, invalidos):
+    VOTE_BUFFER_FLUSHED.inc(insertados)
+    if duplicados:
+        VOTE_BUFFER_DROPPED.labels('duplicate').inc(duplicados)
+    if invalidos:
+        VOTE_BUFFER_DROPPED.labels('invalid').inc(invalidos)
+
+
+def record_buffer_error():
+    VOTE_BUFFER_ERRORS.inc()
+
+
+def record_buffer_recovered():
+    VOTE_BUFFER_RECOVERED.inc()
+
+
+def record_pool_checkout(espera, saturado):
+    """Registra un checkout del pool (espera en segundos)"""
+    DB_POOL_CHECKOUT_WAIT.observe(espera)
+    if saturado:
+        DB_POOL_SATURATED_CHECKOUTS.inc()
+
+
+def record_pool_state(tamano, en_uso, desborde, capacidad):
+    DB_POOL_SIZE.set(tamano)
+    DB_POOL_IN_USE.set(en_uso)
+    DB_POOL_OVERFLOW.set(desborde)
+    DB_POOL_SATURATION.set(en_uso / capacidad if capacidad else 0.0)
+
+
+def record_pool_timeout():
+    DB_POOL_TIMEOUTS.inc()
+
+
+def record_pool_invalidated():
+    DB_POOL_INVALIDATED.inc()
+
+
+def record_serialization(segundos):
+    """Suma tiempo de serialización a la petición en curso (lo llama json_provider.py)"""
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_serialization += segundos
+
+
+# El inicio de cada consulta se guarda en su contexto de ejecución, que se
+# descarta con ella: si la consulta falla no queda nada acumulado en la conexión
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, 'metrics_query_start', None)
+    if inicio is None:
+        return
+    # Las consultas de hilos de fondo (resultados en vivo, buffer de votos) no cuentan
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_queries += 1
+        g.metrics_sql += time.perf_counter() - inicio
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_queries = 0
+    g.metrics_sql = 0.0
+    g.metrics_serialization = 0.0
+
+
+def _after_request(response):
+    if 'metrics_start' not in g:
+        return response
+
+    total = time.perf_counter() - g.metrics_start
+    endpoint = request.url_rule.rule if request.url_rule else 'sin_ruta'
+
+    REQUEST_LATENCY.labels(endpoint, request.method, str(response.status_code)).observe(total)
+    SQL_QUERIES.labels(endpoint).observe(g.metrics_queries)
+    SQL_DURATION.labels(endpoint).observe(g.metrics_sql)
+    SERIALIZATION_DURATION.labels(endpoint).observe(g.metrics_serialization)
+
+    response.headers['Server-Timing'] = ', '.join([
+        f'db;dur={g.metrics_sql * 1000:.2f};desc="{g.metrics_queries} consultas"',
+        f'ser;dur={g.metrics_serialization * 1000:.2f}',
+        f'total;dur={total * 1000:.2f}',
+    ])
+    return response
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def export():
+    """
+    Métricas en formato de texto de Prometheus
+
+    Returns:
+        Tupla (bytes, content_type)
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        # Suma las métricas de todos los workers de gunicorn
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
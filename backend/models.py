@@ -1,6 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
+from sqlalchemy import DDL, PrimaryKeyConstraint, event, func, select
+from sqlalchemy.ext.compiler import compiles
 
 db = SQLAlchemy()
 
@@ -23,9 +25,21 @@ class Configuracion(db.Model):
     election_type = db.Column(db.String(50), default='Presidenciales')
     site_name = db.Column(db.String(200), default='Sistema de Encuestas')
     maintenance_mode = db.Column(db.Boolean, default=False)
+    ronda_actual = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Ronda de votación abierta
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# Ronda abierta como expresión SQL: se evalúa en la misma sentencia que la usa
+RONDA_ACTUAL = func.coalesce(
+    select(Configuracion.ronda_actual).order_by(Configuracion.id).limit(1).scalar_subquery(), 1
+)
+
+# Versión del contenido editable (se incrementa en cada cambio desde el admin)
+class VersionContenido(db.Model):
+    __tablename__ = 'versiones_contenido'
+    nombre = db.Column(db.String(50), primary_key=True)  # ej: 'catalogo', 'config'
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 # Candidatos
 class Candidato(db.Model):
     __tablename__ = 'candidatos'
@@ -37,14 +51,48 @@ class Candidato(db.Model):
     programa = db.Column(db.JSON)
     linea_tiempo = db.Column(db.JSON)
     votos = db.relationship('Voto', backref='candidato', lazy=True, cascade='all, delete-orphan')
+    conteo = db.relationship('ConteoVoto', backref='candidato', lazy=True, uselist=False, cascade='all, delete-orphan')
 
-# Votos
+# Votos (en PostgreSQL, tabla particionada por ronda: votos_r1, votos_r2, ...)
 class Voto(db.Model):
     __tablename__ = 'votos'
     id = db.Column(db.Integer, primary_key=True)
+    ronda = db.Column(db.Integer, nullable=False, default=RONDA_ACTUAL)
     candidato_id = db.Column(db.Integer, db.ForeignKey('candidatos.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     ip_hash = db.Column(db.String(64))
+    __table_args__ = (
+        # Un voto por votante en cada ronda
+        db.Index('uq_votos_ronda_ip_hash', 'ronda', 'ip_hash', unique=True),
+        {'postgresql_partition_by': 'LIST (ronda)'},
+    )
+
+@compiles(PrimaryKeyConstraint, 'postgresql')
+def _pk_votos(constraint, compiler, **kw):
+    # En una tabla particionada la clave primaria debe incluir la columna de partición
+    if constraint.table is not None and constraint.table.name == 'votos':
+        return 'PRIMARY KEY (id, ronda)'
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
+# Partición de la primera ronda al crear la tabla (las siguientes, ver vote_rounds.py)
+event.listen(
+    Voto.__table__, 'after_create',
+    DDL('CREATE TABLE IF NOT EXISTS votos_r1 PARTITION OF votos FOR VALUES IN (1)').execute_if(dialect='postgresql')
+)
+
+# Contador de votos por candidato (se actualiza en la misma transacción que cada voto)
+class ConteoVoto(db.Model):
+    __tablename__ = 'conteo_votos'
+    candidato_id = db.Column(db.Integer, db.ForeignKey('candidatos.id', ondelete='CASCADE'), primary_key=True)
+    votos = db.Column(db.Integer, nullable=False, default=0)
+
+# Votos por candidato agrupados por minuto, hora y día (ver vote_series.py)
+class SerieVoto(db.Model):
+    __tablename__ = 'serie_votos'
+    granularidad = db.Column(db.String(10), primary_key=True)  # 'minute', 'hour', 'day'
+    bucket = db.Column(db.DateTime, primary_key=True)          # inicio del intervalo (UTC)
+    candidato_id = db.Column(db.Integer, db.ForeignKey('candidatos.id', ondelete='CASCADE'), primary_key=True)
+    votos = db.Column(db.Integer, nullable=False, default=0)
 
 # Preguntas del quiz
 class Pregunta(db.Model):
@@ -57,6 +105,10 @@ class Pregunta(db.Model):
 # Respuestas de candidatos a preguntas
 class RespuestaCandidato(db.Model):
     __tablename__ = 'respuestas_candidato'
+    # Una posición por par pregunta/candidato (requerido por la importación en bloque)
+    __table_args__ = (
+        db.Index('uq_respuestas_pregunta_candidato', 'pregunta_id', 'candidato_id', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     pregunta_id = db.Column(db.Integer, db.ForeignKey('preguntas.id'), nullable=False)
     candidato_id = db.Column(db.Integer, db.ForeignKey('candidatos.id'), nullable=False)
@@ -67,6 +119,14 @@ class RespuestaCandidato(db.Model):
 # Noticias
 class Noticia(db.Model):
     __tablename__ = 'noticias'
+    # Índices para la paginación por cursor de /api/noticias (published_at DESC, id DESC):
+    # uno para el listado general y otro para el filtro por fuente, ambos sin paso de ordenamiento
+    __table_args__ = (
+        db.Index('ix_noticias_activas_fecha', 'published_at', 'id',
+                 postgresql_where=db.text('is_active')),
+        db.Index('ix_noticias_activas_fuente_fecha', 'source_id', 'published_at', 'id',
+                 postgresql_where=db.text('is_active')),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
     url = db.Column(db.String(1000), nullable=False, unique=True)
@@ -91,3 +151,35 @@ class FuenteNoticia(db.Model):
     logo = db.Column(db.String(255))
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Validadores HTTP (ETag / Last-Modified) de cada fuente para GET condicionales
+class CacheFuente(db.Model):
+    __tablename__ = 'cache_fuentes'
+    source_id = db.Column(db.String(50), primary_key=True)
+    url = db.Column(db.String(1000))
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(100))
+    hits = db.Column(db.Integer, nullable=False, default=0)    # respuestas 304
+    misses = db.Column(db.Integer, nullable=False, default=0)  # descargas completas
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Bloqueos con tiempo de expiración (exclusión mutua entre procesos)
+class Bloqueo(db.Model):
+    __tablename__ = 'bloqueos'
+    nombre = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(200))
+    expires_at = db.Column(db.DateTime)
+
+# Ejecuciones de la ingesta de noticias
+class EjecucionIngesta(db.Model):
+    __tablename__ = 'ejecuciones_ingesta'
+    id = db.Column(db.Integer, primary_key=True)
+    trigger = db.Column(db.String(20), default='programada')  # 'programada', 'manual'
+    status = db.Column(db.String(20), default='pendiente', index=True)  # 'pendiente', 'en_curso', 'ok', 'error'
+    requested_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    total_scraped = db.Column(db.Integer)
+    nuevas = db.Column(db.Integer)
+    items_por_fuente = db.Column(db.JSON)  # {source_id: cantidad}
+    errores = db.Column(db.JSON)           # {source_id: mensaje}
@@ -0,0 +1,205 @@
+"""
+Ingesta de noticias: ejecuta el scraper y guarda los resultados
+
+El scraping corre en un proceso aparte (ingestion_worker.py) según una
+programación; la API pública solo encola una ejecución. Un bloqueo en la
+base de datos (ver locks.py) garantiza que nunca corran dos a la vez.
+
+Los validadores HTTP de cada fuente (ETag / Last-Modified) se guardan en
+`cache_fuentes` para que la siguiente ejecución haga GET condicionales y
+omita el parseo de las fuentes que respondan 304.
+"""
+import os
+from datetime import datetime
+
+from models import db, Noticia, CacheFuente, EjecucionIngesta
+from db_utils import dialect_insert
+from scraper.news_scraper import NewsScraper, get_political_news
+import locks
+
+LOCK_NAME = 'ingesta_noticias'
+# Debe superar con holgura la duración de una ejecución
+LOCK_TTL = int(os.getenv('NEWS_INGESTION_LOCK_TTL', 600))
+INTERVAL_MINUTES = int(os.getenv('NEWS_INGESTION_INTERVAL_MIN', 30))
+
+
+def _load_validators():
+    return {
+        c.source_id: {'url': c.url, 'etag': c.etag, 'last_modified': c.last_modified}
+        for c in CacheFuente.query.all()
+    }
+
+
+def _save_validators(scraper):
+    """
+    Guarda validadores y contadores de aciertos/fallos de caché, en la misma
+    transacción que las noticias insertadas. Las fuentes sin validadores
+    confirmados por scrape_all quedan sin ellos y se descargan completas.
+    """
+    caches = {c.source_id: c for c in CacheFuente.query.all()}
+
+    for source_id, resultado in scraper.cache_results.items():
+        cache = caches.get(source_id)
+        if not cache:
+            cache = CacheFuente(source_id=source_id, hits=0, misses=0)
+            db.session.add(cache)
+
+        if resultado == 'hit':
+            cache.hits += 1
+        else:
+            cache.misses += 1
+            validators = scraper.validators.get(source_id, {})
+            cache.url = validators.get('url')
+            cache.etag = validators.get('etag')
+            cache.last_modified = validators.get('last_modified')
+
+        nombre = scraper.sources.get(source_id, {}).get('name', source_id)
+        estado = '304 sin cambios' if resultado == 'hit' else 'descarga completa'
+        print(f"Caché {nombre}: {estado} (hits={cache.hits}, misses={cache.misses})")
+
+
+def insert_new(noticias):
+    """
+    Inserta un lote de noticias con un único INSERT multi-fila; las URLs
+    ya existentes se descartan con ON CONFLICT (url) DO NOTHING.
+    No hace commit.
+
+    Returns:
+        Cantidad de noticias nuevas insertadas
+    """
+    if not noticias:
+        return 0
+
+    campos = ('title', 'url', 'summary', 'published_at', 'source',
+              'source_id', 'source_logo', 'image_url')
+    filas = [{campo: n[campo] for campo in campos} for n in noticias]
+
+    tabla = Noticia.__table__
+    stmt = dialect_insert(tabla).values(filas).on_conflict_do_nothing(
+        index_elements=[tabla.c.url]
+    ).returning(tabla.c.id)
+
+    return len(db.session.execute(stmt).all())
+
+
+def scrape_and_store(limit=50):
+    """
+    Ejecuta el scraper y guarda las noticias nuevas
+
+    Returns:
+        Dict con total_scraped, nuevas, items_por_fuente y errores
+    """
+    scraper = NewsScraper()
+    scraper.validators = _load_validators()
+
+    noticias_scraped = get_political_news(limit=limit, scraper=scraper)
+
+    nuevas = insert_new(noticias_scraped)
+    _save_validators(scraper)
+    db.session.commit()
+
+    return {
+        'total_scraped': len(noticias_scraped),
+        'nuevas': nuevas,
+        'items_por_fuente': scraper.items_per_source,
+        'errores': scraper.errors
+    }
+
+
+def enqueue():
+    """
+    Solicita una ejecución. Si ya hay una pendiente se reutiliza.
+
+    Returns:
+        Tupla (ejecucion, creada)
+    """
+    pendiente = EjecucionIngesta.query.filter_by(status='pendiente').order_by(EjecucionIngesta.id).first()
+    if pendiente:
+        return pendiente, False
+
+    ejecucion = EjecucionIngesta(trigger='manual', status='pendiente')
+    db.session.add(ejecucion)
+    db.session.commit()
+    return ejecucion, True
+
+
+def run(trigger='programada', limit=50):
+    """
+    Ejecuta la ingesta si ningún otro proceso la está ejecutando.
+    Atiende primero la solicitud pendiente más antigua, si existe.
+
+    Returns:
+        EjecucionIngesta registrada, o None si otra ejecución está en curso
+    """
+    owner = locks.acquire(LOCK_NAME, LOCK_TTL)
+    if not owner:
+        return None
+
+    try:
+        ejecucion = EjecucionIngesta.query.filter_by(status='pendiente').order_by(EjecucionIngesta.id).first()
+        if not ejecucion:
+            ejecucion = EjecucionIngesta(trigger=trigger)
+            db.session.add(ejecucion)
+        ejecucion.status = 'en_curso'
+        ejecucion.started_at = datetime.utcnow()
+        db.session.commit()
+
+        try:
+            resumen = scrape_and_store(limit=limit)
+            ejecucion.status = 'ok'
+            ejecucion.total_scraped = resumen['total_scraped']
+            ejecucion.nuevas = resumen['nuevas']
+            ejecucion.items_por_fuente = resumen['items_por_fuente']
+            ejecucion.errores = resumen['errores']
+        except Exception as e:
+            db.session.rollback()
+            ejecucion.status = 'error'
+            ejecucion.errores = {'general': str(e)}
+            print(f"Error en la ingesta de noticias: {str(e)}")
+
+        ejecucion.finished_at = datetime.utcnow()
+        db.session.commit()
+        return ejecucion
+    finally:
+        locks.release(LOCK_NAME, owner)
+
+
+def run_pending():
+    """Ejecuta la ingesta solo si alguien la solicitó"""
+    if EjecucionIngesta.query.filter_by(status='pendiente').first():
+        return run(trigger='manual')
+    return None
+
+
+def serialize(ejecucion):
+    duracion = None
+    if ejecucion.started_at and ejecucion.finished_at:
+        duracion = round((ejecucion.finished_at - ejecucion.started_at).total_seconds(), 2)
+
+    return {
+        'id': ejecucion.id,
+        'trigger': ejecucion.trigger,
+        'status': ejecucion.status,
+        'requested_at': ejecucion.requested_at.isoformat() if ejecucion.requested_at else None,
+        'started_at': ejecucion.started_at.isoformat() if ejecucion.started_at else None,
+        'finished_at': ejecucion.finished_at.isoformat() if ejecucion.finished_at else None,
+        'duration_seconds': duracion,
+        'total_scraped': ejecucion.total_scraped,
+        'nuevas': ejecucion.nuevas,
+        'items_por_fuente': ejecucion.items_por_fuente or {},
+        'errores': ejecucion.errores or {}
+    }
+
+
+def status(recientes=10):
+    """Estado de la ingesta para el panel admin"""
+    ejecuciones = EjecucionIngesta.query.order_by(EjecucionIngesta.id.desc()).limit(recientes).all()
+    ultima = next((e for e in ejecuciones if e.status in ('ok', 'error')), None)
+
+    return {
+        'interval_minutes': INTERVAL_MINUTES,
+        'running': locks.is_held(LOCK_NAME),
+        'pending': any(e.status == 'pendiente' for e in ejecuciones),
+        'last_run': serialize(ultima) if ultima else None,
+        'recent': [serialize(e) for e in ejecuciones]
+    }
@@ -0,0 +1,192 @@
+"""
+Matriz de posiciones de los candidatos (preguntas x candidatos)
+
+Importación y exportación en bloque de `respuestas_candidato`, en JSON o
+CSV. Formato JSON:
+
+    {
+        "preguntas": [1, 2, ...],          # filas
+        "candidatos": [1, 2, ...],         # columnas
+        "posiciones": [[3, null, ...], ...] # 1-5, null = sin respuesta
+    }
+
+En CSV la primera columna es `pregunta_id`, la segunda el texto de la
+pregunta (solo informativo) y luego una columna por id de candidato; una
+celda vacía es una pregunta sin responder.
+
+Al importar, la matriz (o el corte) reemplaza lo guardado: las celdas con
+posición se insertan o actualizan y las celdas nulas/vacías borran la
+respuesta que hubiera. Ids y posiciones deben ser enteros en ambos
+formatos (no se aceptan decimales ni booleanos).
+"""
+import csv
+import io
+import re
+
+from sqlalchemy import and_, delete, tuple_
+from models import db, Candidato, Pregunta, RespuestaCandidato
+from db_utils import dialect_insert
+
+POSICION_MIN = 1
+POSICION_MAX = 5
+
+
+class MatrixError(ValueError):
+    """Matriz mal formada o con ids/posiciones inválidos"""
+
+
+def load(candidato_ids=None, pregunta_ids=None):
+    """
+    Arma la matriz (o un corte) con una sola consulta ordenada:
+    preguntas x candidatos con sus respuestas (outer join)
+
+    Returns:
+        Dict con preguntas, candidatos, textos y posiciones
+    """
+    query = db.session.query(
+        Pregunta.id, Pregunta.texto, Candidato.id, RespuestaCandidato.posicion
+    ).select_from(Pregunta).join(Candidato, db.true()).outerjoin(
+        RespuestaCandidato,
+        and_(RespuestaCandidato.pregunta_id == Pregunta.id,
+             RespuestaCandidato.candidato_id == Candidato.id)
+    )
+    if candidato_ids is not None:
+        query = query.filter(Candidato.id.in_(candidato_ids))
+    if pregunta_ids is not None:
+        query = query.filter(Pregunta.id.in_(pregunta_ids))
+    query = query.order_by(Pregunta.orden, Pregunta.id, Candidato.id, RespuestaCandidato.id)
+
+    preguntas, textos, candidatos, posiciones = [], [], [], []
+    anterior = None
+    for pregunta_id, texto, candidato_id, posicion in query:
+        if (pregunta_id, candidato_id) == anterior:
+            # Respuesta repetida (anterior al índice único): gana la primera
+            continue
+        anterior = (pregunta_id, candidato_id)
+        if not preguntas or preguntas[-1] != pregunta_id:
+            preguntas.append(pregunta_id)
+            textos.append(texto)
+            posiciones.append([])
+        if len(preguntas) == 1:
+            candidatos.append(candidato_id)
+        posiciones[-1].append(posicion)
+
+    return {
+        'preguntas': preguntas,
+        'candidatos': candidatos,
+        'textos': textos,
+        'posiciones': posiciones
+    }
+
+
+def to_csv(matriz):
+    salida = io.StringIO()
+    writer = csv.writer(salida)
+    writer.writerow(['pregunta_id', 'pregunta'] + matriz['candidatos'])
+    for pregunta_id, texto, fila in zip(matriz['preguntas'], matriz['textos'], matriz['posiciones']):
+        writer.writerow([pregunta_id, texto] + ['' if p is None else p for p in fila])
+    return salida.getvalue()
+
+
+_ENTERO = re.compile(r'\s*-?\d+\s*')
+
+
+def _entero(valor, que):
+    """Entero estricto: int de JSON o texto con solo dígitos (CSV o JSON)"""
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    if isinstance(valor, str) and _ENTERO.fullmatch(valor):
+        return int(valor)
+    raise MatrixError(f'{que} inválido: {valor!r}')
+
+
+def parse_csv(texto):
+    filas = list(csv.reader(io.StringIO(texto)))
+    if not filas or len(filas[0]) < 3 or filas[0][0].strip() != 'pregunta_id':
+        raise MatrixError('El CSV debe empezar con: pregunta_id,pregunta,<id candidato>...')
+
+    candidatos = [_entero(c, 'candidato_id') for c in filas[0][2:]]
+    preguntas, posiciones = [], []
+    for fila in filas[1:]:
+        if not fila:
+            continue
+        preguntas.append(_entero(fila[0], 'pregunta_id'))
+        celdas = fila[2:] + [''] * (len(candidatos) - len(fila[2:]))
+        posiciones.append([c.strip() or None for c in celdas[:len(candidatos)]])
+
+    return {'preguntas': preguntas, 'candidatos': candidatos, 'posiciones': posiciones}
+
+
+def parse_json(data):
+    if not isinstance(data, dict):
+        raise MatrixError('Se esperaba un objeto con preguntas, candidatos y posiciones')
+    preguntas = [_entero(p, 'pregunta_id') for p in data.get('preguntas') or []]
+    candidatos = [_entero(c, 'candidato_id') for c in data.get('candidatos') or []]
+    posiciones = data.get('posiciones') or []
+
+    if len(posiciones) != len(preguntas) or any(
+        not isinstance(fila, list) or len(fila) != len(candidatos) for fila in posiciones
+    ):
+        raise MatrixError('posiciones debe tener una fila por pregunta y una columna por candidato')
+
+    return {'preguntas': preguntas, 'candidatos': candidatos, 'posiciones': posiciones}
+
+
+def _validar(matriz):
+    """
+    Returns:
+        Tupla (filas a insertar [{pregunta_id, candidato_id, posicion}],
+        pares (pregunta_id, candidato_id) a borrar)
+    """
+    preguntas, candidatos = matriz['preguntas'], matriz['candidatos']
+    if len(set(preguntas)) != len(preguntas) or len(set(candidatos)) != len(candidatos):
+        raise MatrixError('Hay ids de preguntas o candidatos repetidos')
+
+    existentes = {p[0] for p in db.session.query(Pregunta.id).filter(Pregunta.id.in_(preguntas))}
+    faltan = [p for p in preguntas if p not in existentes]
+    if faltan:
+        raise MatrixError(f'Preguntas inexistentes: {faltan}')
+    existentes = {c[0] for c in db.session.query(Candidato.id).filter(Candidato.id.in_(candidatos))}
+    faltan = [c for c in candidatos if c not in existentes]
+    if faltan:
+        raise MatrixError(f'Candidatos inexistentes: {faltan}')
+
+    filas, vacias = [], []
+    for pregunta_id, fila in zip(preguntas, matriz['posiciones']):
+        for candidato_id, posicion in zip(candidatos, fila):
+            if posicion is None:
+                vacias.append((pregunta_id, candidato_id))
+                continue
+            posicion = _entero(posicion, 'posicion')
+            if not POSICION_MIN <= posicion <= POSICION_MAX:
+                raise MatrixError(f'posicion fuera de rango (1-5): pregunta {pregunta_id}, candidato {candidato_id}')
+            filas.append({'pregunta_id': pregunta_id, 'candidato_id': candidato_id, 'posicion': posicion})
+    return filas, vacias
+
+
+def upsert(matriz):
+    """
+    Guarda las celdas no nulas con un único INSERT ... ON CONFLICT DO UPDATE
+    (índice único uq_respuestas_pregunta_candidato) y borra con un único
+    DELETE las respuestas de las celdas nulas. No hace commit.
+
+    Returns:
+        Tupla (celdas escritas, respuestas borradas)
+    """
+    filas, vacias = _validar(matriz)
+    tabla = RespuestaCandidato.__table__
+
+    borradas = 0
+    if vacias:
+        borradas = db.session.execute(
+            delete(tabla).where(tuple_(tabla.c.pregunta_id, tabla.c.candidato_id).in_(vacias))
+        ).rowcount
+
+    if filas:
+        stmt = dialect_insert(tabla).values(filas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabla.c.pregunta_id, tabla.c.candidato_id],
+            set_={'posicion': stmt.excluded.posicion}
+        )
+        db.session.execute(stmt)
+    return len(filas), borradas
@@ -0,0 +1,98 @@
+"""
+Caché de respuestas versionada para las rutas públicas de solo lectura
+
+Cada worker guarda los bytes ya serializados (con orjson, ver
+json_provider.py) de cada recurso junto con la versión del contenido del
+que dependen (ver content_version.py). En un acierto la vista no se
+ejecuta: no hay consultas, ni objetos ORM, ni codificación JSON. Como las
+rutas admin incrementan esa versión al modificar datos, todos los workers
+descartan sus copias sin necesidad de comunicarse entre sí.
+
+La clave de cada entrada es la ruta (endpoint y sus argumentos) más solo
+los parámetros de la query string que la vista lee, normalizados: otros
+parámetros no crean entradas nuevas. Si se llega a MAX_ENTRIES se descarta
+la entrada usada hace más tiempo.
+
+El ETag depende solo de la versión y de esa clave, de modo que cualquier
+worker puede responder 304 a un If-None-Match sin generar la respuesta.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response, Response
+
+import content_version
+
+# Límite de entradas por worker
+MAX_ENTRIES = 512
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # {clave: (versiones, cuerpo, mimetype)}, de la menos a la más usada
+
+
+# Cambia si cambia el formato de los bytes (p. ej. el codificador JSON),
+# para que un ETag fuerte nunca corresponda a dos cuerpos distintos
+FORMATO = 'orjson1'
+
+
+def _etag(nombres, versiones, clave):
+    digest = hashlib.sha1(f'{FORMATO}:{clave}'.encode('utf-8')).hexdigest()[:12]
+    partes = '-'.join(f'{n}{v}' for n, v in zip(nombres, versiones))
+    return f'{partes}-{digest}'
+
+
+def _normalizar(valor):
+    # Listas separadas por coma: sin orden, espacios ni repetidos
+    return ','.join(sorted({v.strip() for v in valor.split(',') if v.strip()}))
+
+
+def _clave(params):
+    argumentos = sorted((request.view_args or {}).items())
+    consulta = [(p, _normalizar(request.args.get(p, ''))) for p in params]
+    return f'{request.endpoint}:{argumentos}:{consulta}'
+
+
+def cached_response(*nombres, params=()):
+    """
+    Decorador: cachea la respuesta mientras no cambien las versiones indicadas
+
+    Args:
+        nombres: Claves de content_version de las que depende la respuesta
+        params: Parámetros de la query string que lee la vista (listas
+            separadas por coma); los demás se ignoran
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versiones = tuple(content_version.get_cached(n) for n in nombres)
+            clave = _clave(params)
+            etag = _etag(nombres, versiones, clave)
+
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                with _lock:
+                    entrada = _cache.get(clave)
+                    if entrada:
+                        _cache.move_to_end(clave)
+                if entrada and entrada[0] == versiones:
+                    response = Response(entrada[1], mimetype=entrada[2])
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        # Errores (404, 400...) no se cachean ni llevan ETag
+                        return response
+                    with _lock:
+                        _cache[clave] = (versiones, response.get_data(), response.mimetype)
+                        _cache.move_to_end(clave)
+                        while len(_cache) > MAX_ENTRIES:
+                            _cache.popitem(last=False)
+
+            response.set_etag(etag)
+            # El navegador debe revalidar siempre (responde 304 si no cambió)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,150 @@
+"""
+Resultados en vivo con Server-Sent Events
+
+Un único hilo productor por worker consulta los contadores (ver tally.py)
+cada RESULTS_STREAM_INTERVAL_MS y publica una nueva instantánea solo cuando
+los conteos cambian. Todos los clientes conectados al worker esperan sobre
+la misma condición, de modo que las consultas dependen de la tasa de votos
+y no del número de pestañas abiertas.
+
+Cada conexión abierta sí ocupa un hilo (gthread) o un greenlet (gevent)
+del worker, por eso se aceptan como máximo `max_subscribers` por worker
+(ver worker_settings.stream_subscribers); el resto recibe 503 y el
+frontend consulta /api/resultados periódicamente.
+"""
+import os
+import threading
+import time
+
+import tally
+import worker_settings
+
+
+class ResultsBroadcaster:
+    """Publica instantáneas de resultados a todos los suscriptores del worker"""
+
+    def __init__(self, interval_ms=500, heartbeat=15, max_duration=300, max_subscribers=4):
+        self.interval = interval_ms / 1000.0
+        self.heartbeat = heartbeat
+        self.max_duration = max_duration
+        self.max_subscribers = max_subscribers
+        self.app = None
+
+        self._cond = threading.Condition()
+        self._version = 0
+        self._payload = None
+        self._subscribers = 0
+        self._producer = None
+        self._pid = None
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['results_broadcaster'] = self
+
+    def open(self):
+        """
+        Reserva un lugar para una conexión nueva
+
+        Returns:
+            Iterable SSE para la respuesta (libera el lugar al cerrarse),
+            o None si el worker ya tiene max_subscribers clientes
+        """
+        if not self._subscribe():
+            return None
+        return _Suscripcion(self)
+
+    def _stream(self):
+        """Generador SSE para una conexión (el lugar ya está reservado)"""
+        version, payload = self._wait_for(None, timeout=10)
+        # Reconexión del EventSource tras 3 s si se corta
+        yield 'retry: 3000\n\n'
+        if payload is not None:
+            yield f'data: {payload}\n\n'
+
+        # Se cierra periódicamente para no fijar conexiones indefinidamente;
+        # el navegador reconecta solo
+        fin = time.monotonic() + self.max_duration
+        while time.monotonic() < fin:
+            nueva_version, nuevo_payload = self._wait_for(version, timeout=self.heartbeat)
+            if nueva_version == version:
+                yield ': ping\n\n'
+                continue
+            version = nueva_version
+            yield f'data: {nuevo_payload}\n\n'
+
+    # ---------- Internos ----------
+
+    def _wait_for(self, version, timeout):
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._version != version and self._payload is not None,
+                timeout=timeout
+            )
+            return self._version, self._payload
+
+    def _subscribe(self):
+        with self._cond:
+            if self._subscribers >= self.max_subscribers:
+                return False
+            self._subscribers += 1
+            # El hilo productor se crea por proceso (después del fork de gunicorn)
+            if self._pid != os.getpid() or self._producer is None:
+                self._pid = os.getpid()
+                self._producer = threading.Thread(target=self._run, name='results-stream', daemon=True)
+                self._producer.start()
+        return True
+
+    def _unsubscribe(self):
+        with self._cond:
+            self._subscribers -= 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._subscribers <= 0:
+                    # Sin clientes: el productor termina y se recrea al próximo
+                    self._producer = None
+                    self._payload = None
+                    return
+            try:
+                with self.app.app_context():
+                    payload = self.app.json.dumps(tally.build_resultados())
+                if payload != self._payload:
+                    with self._cond:
+                        self._payload = payload
+                        self._version += 1
+                        self._cond.notify_all()
+            except Exception:
+                self.app.logger.exception('Error generando resultados en vivo')
+            time.sleep(self.interval)
+
+
+class _Suscripcion:
+    """
+    Cuerpo de la respuesta SSE. El servidor WSGI llama a close() al terminar
+    la respuesta, aunque el cliente se haya ido antes del primer evento, así
+    que el lugar reservado siempre se libera.
+    """
+
+    def __init__(self, broadcaster):
+        self._broadcaster = broadcaster
+        self._eventos = broadcaster._stream()
+        self._cerrada = False
+
+    def __iter__(self):
+        return self._eventos
+
+    def close(self):
+        if self._cerrada:
+            return
+        self._cerrada = True
+        self._eventos.close()
+        self._broadcaster._unsubscribe()
+
+
+broadcaster = ResultsBroadcaster(
+    interval_ms=int(os.getenv('RESULTS_STREAM_INTERVAL_MS', 500)),
+    heartbeat=int(os.getenv('RESULTS_STREAM_HEARTBEAT', 15)),
+    max_duration=int(os.getenv('RESULTS_STREAM_MAX_DURATION', 300)),
+    max_subscribers=worker_settings.stream_subscribers()
+)
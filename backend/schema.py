@@ -0,0 +1,190 @@
+"""
+Actualización del esquema de una base de datos existente
+
+`db.create_all()` crea las tablas nuevas pero no modifica las existentes.
+Este módulo aplica, de forma idempotente, los cambios que necesitan las
+tablas ya creadas en producción. Se ejecuta con:
+
+    flask --app app actualizar-esquema [--dry-run]
+"""
+from sqlalchemy import delete, func, inspect, select, text
+from models import db, Voto, Noticia, RespuestaCandidato
+from db_utils import is_postgresql
+import content_version
+import tally
+import vote_rounds
+import vote_series
+
+
+def _index_exists(tabla, nombre):
+    return any(i['name'] == nombre for i in inspect(db.engine).get_indexes(tabla))
+
+
+def _create_index(tabla, nombre):
+    """Crea un índice declarado en los modelos si aún no existe"""
+    if _index_exists(tabla.name, nombre):
+        return False
+    indice = next(i for i in tabla.indexes if i.name == nombre)
+    indice.create(db.engine)
+    return True
+
+
+def _column_exists(tabla, nombre):
+    return any(c['name'] == nombre for c in inspect(db.engine).get_columns(tabla))
+
+
+def _add_column(tabla, definicion):
+    db.session.execute(text(f'ALTER TABLE {tabla} ADD COLUMN {definicion}'))
+    db.session.commit()
+
+
+def dedupe_votos(dry_run=False):
+    """
+    Elimina votos repetidos por ronda e ip_hash (conserva el primero de cada
+    votante), requisito para crear el índice único uq_votos_ronda_ip_hash.
+
+    Returns:
+        Cantidad de votos repetidos encontrados
+    """
+    primeros = select(func.min(Voto.id)).where(Voto.ip_hash.isnot(None)).group_by(Voto.ronda, Voto.ip_hash)
+    repetidos = db.session.query(func.count(Voto.id)).filter(
+        Voto.ip_hash.isnot(None), Voto.id.notin_(primeros)
+    ).scalar()
+
+    if repetidos and not dry_run:
+        db.session.execute(
+            delete(Voto).where(Voto.ip_hash.isnot(None), Voto.id.notin_(primeros))
+        )
+        db.session.commit()
+        # Los contadores incluían los votos eliminados
+        tally.reconcile()
+
+    return repetidos
+
+
+def dedupe_respuestas(dry_run=False):
+    """
+    Elimina respuestas repetidas por (pregunta_id, candidato_id), conservando
+    la primera (la que ya usaba el quiz), requisito para crear el índice único
+    uq_respuestas_pregunta_candidato.
+
+    Returns:
+        Cantidad de respuestas repetidas encontradas
+    """
+    primeras = select(func.min(RespuestaCandidato.id)).group_by(
+        RespuestaCandidato.pregunta_id, RespuestaCandidato.candidato_id
+    )
+    repetidas = db.session.query(func.count(RespuestaCandidato.id)).filter(
+        RespuestaCandidato.id.notin_(primeras)
+    ).scalar()
+
+    if repetidas and not dry_run:
+        db.session.execute(delete(RespuestaCandidato).where(RespuestaCandidato.id.notin_(primeras)))
+        content_version.bump(content_version.CATALOGO)
+        db.session.commit()
+
+    return repetidas
+
+
+def partition_votos():
+    """
+    Convierte `votos` (PostgreSQL) en una tabla particionada por ronda. La
+    tabla existente pasa a ser la partición votos_r1, sin copiar filas; solo
+    se construyen sus índices nuevos. Todo en una transacción.
+    """
+    secuencia = db.session.execute(text("SELECT pg_get_serial_sequence('votos', 'id')")).scalar()
+    db.session.execute(text('LOCK TABLE votos IN ACCESS EXCLUSIVE MODE'))
+    ultimo_id = db.session.execute(text('SELECT COALESCE(MAX(id), 0) FROM votos')).scalar()
+
+    # Libera los nombres (clave primaria, índices, secuencia) para la tabla nueva
+    db.session.execute(text('ALTER TABLE votos RENAME TO votos_r1'))
+    db.session.execute(text('ALTER TABLE votos_r1 DROP CONSTRAINT IF EXISTS votos_pkey'))
+    db.session.execute(text('DROP INDEX IF EXISTS ix_votos_ip_hash'))
+    db.session.execute(text('DROP INDEX IF EXISTS uq_votos_ronda_ip_hash'))
+    db.session.execute(text('ALTER TABLE votos_r1 ALTER COLUMN id DROP DEFAULT'))
+    db.session.execute(text('ALTER TABLE votos_r1 ALTER COLUMN ronda DROP DEFAULT'))
+    if secuencia:
+        db.session.execute(text(f'DROP SEQUENCE {secuencia}'))
+
+    Voto.__table__.create(db.session.connection())
+    db.session.execute(text("SELECT setval(pg_get_serial_sequence('votos', 'id'), :siguiente, false)"),
+                       {'siguiente': ultimo_id + 1})
+    db.session.execute(text('ALTER TABLE votos ATTACH PARTITION votos_r1 FOR VALUES IN (1)'))
+    db.session.commit()
+
+
+def upgrade(dry_run=False, log=print):
+    """Aplica todos los pasos pendientes"""
+    conteo_pendiente = not inspect(db.engine).has_table('conteo_votos')
+    serie_pendiente = not inspect(db.engine).has_table('serie_votos')
+
+    if dry_run:
+        log("Modo simulación: no se aplicarán cambios")
+    else:
+        db.create_all()
+        log("✅ Tablas nuevas creadas (si faltaban)")
+
+    # Rondas de votación: los votos existentes quedan en la ronda 1
+    for tabla, columna in (('configuracion', 'ronda_actual'), ('votos', 'ronda')):
+        if _column_exists(tabla, columna):
+            continue
+        if dry_run:
+            log(f"Columna pendiente: {tabla}.{columna}")
+        else:
+            _add_column(tabla, f"{columna} INTEGER NOT NULL DEFAULT 1")
+            log(f"✅ Columna {tabla}.{columna} agregada")
+
+    # Votos: un voto por votante en cada ronda
+    if not _index_exists('votos', 'uq_votos_ronda_ip_hash') and _column_exists('votos', 'ronda'):
+        repetidos = dedupe_votos(dry_run=dry_run)
+        log(f"Votos repetidos por ronda/ip_hash: {repetidos}" + (" (eliminados)" if repetidos and not dry_run else ""))
+        if not dry_run and not is_postgresql():
+            _create_index(Voto.__table__, 'uq_votos_ronda_ip_hash')
+            if _index_exists('votos', 'ix_votos_ip_hash'):
+                db.session.execute(text('DROP INDEX ix_votos_ip_hash'))
+                db.session.commit()
+            log("✅ Índice único uq_votos_ronda_ip_hash creado")
+
+    # PostgreSQL: votos particionada por ronda (la tabla nueva trae el índice único)
+    if is_postgresql() and not vote_rounds.is_partitioned():
+        if dry_run:
+            log("Tabla votos pendiente de particionar por ronda")
+        else:
+            partition_votos()
+            log("✅ Tabla votos particionada por ronda (votos_r1 = votos existentes)")
+    if is_postgresql() and not dry_run:
+        vote_rounds.ensure_partition(vote_rounds.current())
+        db.session.commit()
+
+    # Contadores y serie temporal: se llenan una vez con los votos existentes
+    if conteo_pendiente:
+        if dry_run:
+            log("Contadores de votos pendientes de construir")
+        else:
+            total = tally.reconcile()
+            log(f"✅ Contadores y serie temporal construidos: {total} votos")
+    elif serie_pendiente:
+        if dry_run:
+            log("Serie temporal de votos pendiente de construir")
+        else:
+            vote_series.rebuild(vote_rounds.current())
+            db.session.commit()
+            log("✅ Serie temporal de votos construida")
+
+    # Respuestas de candidatos: una posición por pregunta y candidato
+    if not _index_exists('respuestas_candidato', 'uq_respuestas_pregunta_candidato'):
+        repetidas = dedupe_respuestas(dry_run=dry_run)
+        log(f"Respuestas repetidas por pregunta/candidato: {repetidas}" + (" (eliminadas)" if repetidas and not dry_run else ""))
+        if not dry_run:
+            _create_index(RespuestaCandidato.__table__, 'uq_respuestas_pregunta_candidato')
+            log("✅ Índice único uq_respuestas_pregunta_candidato creado")
+
+    # Noticias: índices para la paginación por cursor
+    for nombre in ('ix_noticias_activas_fecha', 'ix_noticias_activas_fuente_fecha'):
+        if _index_exists('noticias', nombre):
+            continue
+        if dry_run:
+            log(f"Índice pendiente: {nombre}")
+        else:
+            _create_index(Noticia.__table__, nombre)
+            log(f"✅ Índice {nombre} creado")
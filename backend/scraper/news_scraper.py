@@ -3,13 +3,33 @@ from bs4 import BeautifulSoup
 import feedparser
 from datetime import datetime, timedelta
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 
 class NewsScraper:
     """
     Web scraper para noticias políticas y electorales de múltiples fuentes
     """
 
-    def __init__(self):
+    def __init__(self, timeout=10, deadline=25):
+        """
+        Args:
+            timeout: Tiempo máximo (segundos) de cada petición HTTP a una fuente
+            deadline: Tiempo máximo total de scrape_all; las fuentes que no
+                      terminen a tiempo se reportan como error y se omiten
+        """
+        self.timeout = timeout
+        self.deadline = deadline
+        # Validadores HTTP por fuente: {source_id: {'url', 'etag', 'last_modified'}}
+        # Se pueden precargar antes de scrape_all para hacer GET condicionales.
+        # scrape_all solo los actualiza para las fuentes cuyas noticias se
+        # parsearon y se devolvieron completas en esa ejecución
+        self.validators = {}
+        # Resultado de caché de la última ejecución: {source_id: 'hit' | 'miss'}
+        self.cache_results = {}
+        # Resumen de la última ejecución por fuente
+        self.items_per_source = {}  # {source_id: cantidad tras filtrar}
+        self.errors = {}            # {source_id: mensaje}
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -53,33 +73,115 @@ class NewsScraper:
         """
         all_news = []
 
+        # Las fuentes se consultan en paralelo: el tiempo total es el de la más lenta
+        pool = ThreadPoolExecutor(max_workers=len(self.sources) or 1, thread_name_prefix='scraper')
+        futures = {
+            source_id: pool.submit(self._scrape_source, source_id, source_config, limit)
+            for source_id, source_config in self.sources.items()
+        }
+        wait(futures.values(), timeout=self.deadline)
+        # No esperar a las fuentes que excedieron el tiempo límite global
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        # Recorrer en el orden configurado para mantener resultados deterministas.
+        # Solo se leen las fuentes terminadas a tiempo: lo que haga después un
+        # hilo rezagado no afecta a esta ejecución ni a sus validadores
+        descargas = {}  # {source_id: (cache, validadores, noticias tras filtrar)}
         for source_id, source_config in self.sources.items():
+            future = futures[source_id]
+            if not future.done():
+                self.errors[source_id] = f'tiempo límite global ({self.deadline}s) excedido'
+                print(f"Error scraping {source_config['name']}: {self.errors[source_id]}")
+                continue
             try:
-                if source_config['type'] == 'rss':
-                    news = self._scrape_rss(source_id, source_config, limit)
-                else:
-                    news = self._scrape_html(source_id, source_config, limit)
+                news, cache, validadores = future.result()
 
                 # Filtrar por keywords si se proporcionan
                 if keywords:
                     news = self._filter_by_keywords(news, keywords)
 
+                self.items_per_source[source_id] = len(news)
                 all_news.extend(news)
+                descargas[source_id] = (cache, validadores, len(news))
             except Exception as e:
+                self.errors[source_id] = str(e)
                 print(f"Error scraping {source_config['name']}: {str(e)}")
                 continue
 
         # Ordenar por fecha (más recientes primero)
         all_news.sort(key=lambda x: x['published_at'], reverse=True)
+        seleccion = all_news[:limit]
 
-        return all_news[:limit]
+        devueltas = Counter(n['source_id'] for n in seleccion)
+        for source_id, (cache, validadores, total) in descargas.items():
+            if cache is None:
+                continue
+            self.cache_results[source_id] = cache
+            if cache == 'miss':
+                if validadores and devueltas[source_id] == total:
+                    self.validators[source_id] = validadores
+                else:
+                    # Parte de sus noticias quedó fuera del límite (o falló el
+                    # parseo): sin validadores la próxima ejecución descarga todo
+                    # en lugar de recibir un 304 y perderlas
+                    self.validators.pop(source_id, None)
+
+        return seleccion
+
+    def _scrape_source(self, source_id, config, limit):
+        """
+        Scrape una fuente según su tipo (se ejecuta en un hilo del pool)
+
+        Returns:
+            Tupla (noticias, cache, validadores): cache es 'hit' (304), 'miss'
+            o None si la descarga falló; validadores solo si se parseó bien
+        """
+        if config['type'] == 'rss':
+            return self._scrape_rss(source_id, config, limit)
+        return self._scrape_html(source_id, config, limit)
+
+    def _fetch(self, source_id, url):
+        """
+        GET condicional: envía If-None-Match / If-Modified-Since si hay
+        validadores guardados para la fuente. No modifica self.validators
+        (ver scrape_all).
+
+        Returns:
+            Tupla (response, validadores nuevos), o (None, None) si el
+            servidor respondió 304 (sin cambios)
+        """
+        headers = dict(self.headers)
+        cached = self.validators.get(source_id)
+        if cached and cached.get('url') == url:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = requests.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None, None
+
+        response.raise_for_status()
+        return response, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
 
     def _scrape_rss(self, source_id, config, limit):
         """Scrape noticias desde un feed RSS"""
         news = []
+        cache = validadores = None
 
         try:
-            feed = feedparser.parse(config['rss'])
+            # Descargar con requests para respetar el timeout por fuente
+            response, validadores = self._fetch(source_id, config['rss'])
+            if response is None:
+                # 304: el feed no cambió, no hay nada que parsear
+                return news, 'hit', None
+            cache = 'miss'
+            feed = feedparser.parse(response.content)
 
             for entry in feed.entries[:limit]:
                 news_item = {
@@ -95,17 +197,23 @@ class NewsScraper:
                 news.append(news_item)
 
         except Exception as e:
+            self.errors[source_id] = str(e)
             print(f"Error parsing RSS {config['name']}: {str(e)}")
+            validadores = None
 
-        return news
+        return news, cache, validadores
 
     def _scrape_html(self, source_id, config, limit):
         """Scrape noticias desde HTML (método genérico)"""
         news = []
+        cache = validadores = None
 
         try:
-            response = requests.get(config['url'], headers=self.headers, timeout=10)
-            response.raise_for_status()
+            response, validadores = self._fetch(source_id, config['url'])
+            if response is None:
+                # 304: la página no cambió, no hay nada que parsear
+                return news, 'hit', None
+            cache = 'miss'
 
             soup = BeautifulSoup(response.content, 'html.parser')
 
@@ -165,9 +273,11 @@ class NewsScraper:
                     continue
 
         except Exception as e:
+            self.errors[source_id] = str(e)
             print(f"Error scraping HTML {config['name']}: {str(e)}")
+            validadores = None
 
-        return news
+        return news, cache, validadores
 
     def _extract_image_from_rss(self, entry):
         """Extrae URL de imagen de una entrada RSS"""
@@ -229,14 +339,17 @@ class NewsScraper:
 
 
 # Función auxiliar para usar directamente
-def get_political_news(limit=20):
+def get_political_news(limit=20, scraper=None):
     """
     Obtiene noticias políticas/electorales
 
+    Args:
+        scraper: NewsScraper a usar (p. ej. con validadores precargados)
+
     Returns:
         Lista de noticias filtradas por keywords políticas
     """
-    scraper = NewsScraper()
+    scraper = scraper or NewsScraper()
     keywords = [
         'elecciones', 'presidencial', 'candidato', 'campaña',
         'votación', 'encuesta', 'política', 'gobierno',
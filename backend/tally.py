@@ -0,0 +1,117 @@
+"""
+Motor de conteo de votos
+
+Mantiene la tabla `conteo_votos` (un contador por candidato) sincronizada
+con `votos`, de modo que los resultados se leen con una sola consulta
+sobre una tabla pequeña en lugar de contar todos los votos.
+"""
+from sqlalchemy import delete, insert, select, text
+from models import db, Voto, ConteoVoto
+from db_utils import dialect_insert, is_postgresql
+import catalog
+import vote_rounds
+import vote_series
+
+
+def record_vote(candidato_id, cantidad=1):
+    """
+    Incrementa el contador de un candidato dentro de la transacción actual.
+    No hace commit: debe llamarse junto al INSERT del voto.
+    """
+    tabla = ConteoVoto.__table__
+    stmt = dialect_insert(tabla).values(candidato_id=candidato_id, votos=cantidad)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tabla.c.candidato_id],
+        set_={'votos': tabla.c.votos + stmt.excluded.votos}
+    )
+    db.session.execute(stmt)
+
+
+def record_votes(votos):
+    """
+    Registra votos ya insertados en `votos`: contadores por candidato y
+    serie temporal (ver vote_series.py). No hace commit.
+
+    Args:
+        votos: lista de (candidato_id, timestamp)
+    """
+    por_candidato = {}
+    for candidato_id, _ in votos:
+        por_candidato[candidato_id] = por_candidato.get(candidato_id, 0) + 1
+    # Orden fijo de filas para que transacciones concurrentes no se bloqueen mutuamente
+    for candidato_id in sorted(por_candidato):
+        record_vote(candidato_id, por_candidato[candidato_id])
+    vote_series.record(votos)
+
+
+def get_tally():
+    """
+    Obtiene los votos de cada candidato con una sola consulta a `conteo_votos`
+    (los nombres salen de la foto del catálogo, ver catalog.py)
+
+    Returns:
+        Tupla (total_votos, [(candidato_id, nombre, votos), ...])
+    """
+    votos = dict(db.session.query(ConteoVoto.candidato_id, ConteoVoto.votos).all())
+    filas = [(c.id, c.nombre, votos.get(c.id, 0)) for c in catalog.get_snapshot().candidatos]
+
+    total = sum(f[2] for f in filas)
+    return total, filas
+
+
+def build_resultados():
+    """Arma la respuesta de /api/resultados a partir de los contadores"""
+    return format_resultados(*get_tally())
+
+
+def format_resultados(total_votos, conteos):
+    """Porcentajes por candidato a partir de [(candidato_id, nombre, votos), ...]"""
+    resultados = []
+    for candidato_id, nombre, votos_candidato in conteos:
+        porcentaje = (votos_candidato / total_votos * 100) if total_votos > 0 else 0
+        resultados.append({
+            'candidato_id': candidato_id,
+            'nombre': nombre,
+            'votos': votos_candidato,
+            'porcentaje': round(porcentaje, 2)
+        })
+
+    return {
+        'total_votos': total_votos,
+        'resultados': resultados
+    }
+
+
+def reset_tally():
+    """Elimina todos los contadores y la serie (usar al reiniciar o cambiar de ronda)"""
+    db.session.execute(delete(ConteoVoto))
+    vote_series.reset()
+
+
+def reconcile():
+    """
+    Reconstruye los contadores y la serie temporal a partir de los votos de
+    la ronda abierta. Útil después de reiniciar votos o de una caída.
+
+    Returns:
+        Total de votos contados
+    """
+    if is_postgresql():
+        # Bloquear escrituras en votos mientras se reconstruye
+        db.session.execute(text('LOCK TABLE votos IN SHARE MODE'))
+
+    ronda = vote_rounds.current()
+    reset_tally()
+    db.session.execute(
+        insert(ConteoVoto).from_select(
+            ['candidato_id', 'votos'],
+            select(Voto.candidato_id, db.func.count(Voto.id))
+            .where(Voto.ronda == ronda)
+            .group_by(Voto.candidato_id)
+        )
+    )
+    vote_series.rebuild(ronda)
+    db.session.commit()
+
+    total, _ = get_tally()
+    return total
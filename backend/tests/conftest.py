@@ -0,0 +1,80 @@
+"""
+Fixtures comunes de los tests
+
+La app se importa una sola vez sobre una base SQLite temporal; cada test
+parte de la base recreada con los datos de ejemplo (POST /api/init-db).
+
+Uso (desde backend/):
+    pip install pytest
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Debe definirse antes de importar app.py (lee DATABASE_URL al importarse)
+_DIRECTORIO = tempfile.mkdtemp(prefix='encuestas-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DIRECTORIO, 'test.db')}"
+os.environ['ADMISSION_ENABLED'] = 'false'
+os.environ['CONTENT_VERSION_TTL'] = '0'
+os.environ.pop('VOTE_INGESTION', None)
+os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt  # noqa: E402
+from app import app as flask_app  # noqa: E402
+from models import db, Usuario  # noqa: E402
+import catalog  # noqa: E402
+import content_version  # noqa: E402
+import response_cache  # noqa: E402
+import vote_rounds  # noqa: E402
+
+
+def _vaciar_caches():
+    # Cada test usa una base nueva: las cachés del proceso no deben
+    # arrastrar versiones ni resultados del test anterior
+    catalog._snapshot = None
+    content_version._memo.clear()
+    response_cache._cache.clear()
+    vote_rounds._resultados_archivados.clear()
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.drop_all()
+    _vaciar_caches()
+
+    respuesta = flask_app.test_client().post('/api/init-db')
+    assert respuesta.status_code == 201
+
+    with flask_app.app_context():
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin(app):
+    """Cliente con sesión de administrador iniciada"""
+    db.session.add(Usuario(
+        username='admin', email='admin@example.com',
+        password_hash=bcrypt.hashpw(b'clave', bcrypt.gensalt(4)).decode()
+    ))
+    db.session.commit()
+
+    cliente = app.test_client()
+    respuesta = cliente.post('/api/admin/login', json={'username': 'admin', 'password': 'clave'})
+    assert respuesta.status_code == 200
+    return cliente
+
+
+def votar(client, candidato_id, ip_hash):
+    return client.post('/api/votar', json={'candidato_id': candidato_id, 'ip_hash': ip_hash})
@@ -0,0 +1,53 @@
+"""Telemetría del pool de conexiones (db_pool.py) en las métricas de Prometheus"""
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+
+import db_pool
+
+
+def _valor(nombre):
+    return REGISTRY.get_sample_value(nombre) or 0.0
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', poolclass=db_pool.TimedQueuePool,
+                           pool_size=1, max_overflow=1, pool_timeout=0.05)
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_actualiza_metricas(engine):
+    checkouts = _valor('encuestas_db_pool_checkout_wait_seconds_count')
+    saturados = _valor('encuestas_db_pool_saturated_checkouts_total')
+
+    with engine.connect() as primera, engine.connect() as segunda:
+        primera.execute(text('SELECT 1'))
+        segunda.execute(text('SELECT 1'))
+        assert _valor('encuestas_db_pool_in_use') == 2
+        assert _valor('encuestas_db_pool_overflow') == 1
+        assert _valor('encuestas_db_pool_saturation') == 1.0
+
+    assert _valor('encuestas_db_pool_checkout_wait_seconds_count') == checkouts + 2
+    assert _valor('encuestas_db_pool_saturated_checkouts_total') == saturados + 1
+    # Al devolverlas, los gauges reflejan el pool libre
+    assert _valor('encuestas_db_pool_in_use') == 0
+    assert _valor('encuestas_db_pool_saturation') == 0.0
+
+
+def test_timeout_se_cuenta(engine):
+    timeouts = _valor('encuestas_db_pool_timeouts_total')
+
+    with engine.connect(), engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    assert _valor('encuestas_db_pool_timeouts_total') == timeouts + 1
+
+
+def test_endpoint_json_es_solo_del_worker(admin):
+    datos = admin.get('/api/admin/db-pool').get_json()
+
+    assert datos['scope'] == 'worker'
+    assert datos['all_workers'] == '/api/admin/metrics'
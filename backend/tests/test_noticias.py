@@ -0,0 +1,67 @@
+"""Paginación por cursor de /api/noticias"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Noticia
+
+INICIO = datetime(2025, 11, 16, 12, 0)
+
+
+@pytest.fixture
+def noticias(app):
+    # Varias noticias comparten published_at: el cursor desempata por id
+    filas = []
+    for i in range(7):
+        filas.append(Noticia(
+            title=f'Noticia {i}', url=f'https://example.com/{i}',
+            published_at=INICIO - timedelta(hours=i // 2),
+            source_id='emol' if i % 2 else 'biobio'
+        ))
+    filas.append(Noticia(title='Inactiva', url='https://example.com/x',
+                         published_at=INICIO, source_id='emol', is_active=False))
+    db.session.add_all(filas)
+    db.session.commit()
+    return filas
+
+
+def _recorrer(client, **params):
+    ids, cursor, paginas = [], None, 0
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        datos = client.get('/api/noticias', query_string=query).get_json()
+        ids.extend(n['id'] for n in datos['noticias'])
+        paginas += 1
+        cursor = datos['next_cursor']
+        if cursor is None:
+            return ids, paginas
+
+
+def _esperado(noticias, source_id=None):
+    activas = [n for n in noticias if n.is_active and source_id in (None, n.source_id)]
+    return [n.id for n in sorted(activas, key=lambda n: (n.published_at, n.id), reverse=True)]
+
+
+def test_recorre_todas_las_paginas_sin_repetir(client, noticias):
+    ids, paginas = _recorrer(client, limit=2)
+
+    assert ids == _esperado(noticias)
+    assert paginas == 4
+
+
+def test_ultima_pagina_exacta_no_tiene_cursor(client, noticias):
+    datos = client.get('/api/noticias', query_string={'limit': 7}).get_json()
+
+    assert len(datos['noticias']) == 7
+    assert datos['next_cursor'] is None
+
+
+def test_filtro_por_fuente(client, noticias):
+    ids, _ = _recorrer(client, limit=2, source='emol')
+
+    assert ids == _esperado(noticias, 'emol')
+
+
+@pytest.mark.parametrize('cursor', ['no-es-base64!', 'c2luLXNlcGFyYWRvcg', 'MjAyNS0xMS0xNnxhYmM'])
+def test_cursor_invalido(client, noticias, cursor):
+    assert client.get('/api/noticias', query_string={'cursor': cursor}).status_code == 400
@@ -0,0 +1,81 @@
+"""Importación y exportación de la matriz de posiciones (position_matrix.py)"""
+import pytest
+
+from models import RespuestaCandidato
+
+URL = '/api/admin/respuestas/matriz'
+
+
+def _posicion(pregunta_id, candidato_id):
+    respuesta = RespuestaCandidato.query.filter_by(
+        pregunta_id=pregunta_id, candidato_id=candidato_id
+    ).one_or_none()
+    return respuesta.posicion if respuesta else None
+
+
+def test_exporta_y_reimporta_sin_cambios(admin):
+    matriz = admin.get(URL).get_json()
+    assert matriz['candidatos'] == [1, 2]
+    assert len(matriz['preguntas']) == 8
+
+    respuesta = admin.put(URL, json={k: matriz[k] for k in ('preguntas', 'candidatos', 'posiciones')})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['escritas'] == 16
+    assert admin.get(URL).get_json()['posiciones'] == matriz['posiciones']
+
+
+def test_celda_nula_borra_la_respuesta(admin):
+    respuesta = admin.put(URL, json={'preguntas': [1], 'candidatos': [1, 2], 'posiciones': [[None, 4]]})
+
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['borradas'] == 1
+    assert _posicion(1, 1) is None
+    assert _posicion(1, 2) == 4
+    assert admin.get(URL, query_string={'preguntas': '1'}).get_json()['posiciones'] == [[None, 4]]
+
+
+def test_celda_vacia_en_csv_borra_la_respuesta(admin):
+    csv = 'pregunta_id,pregunta,1,2\n1,texto,5,\n'
+    respuesta = admin.put(URL, data=csv, content_type='text/csv')
+
+    assert respuesta.status_code == 200
+    assert _posicion(1, 1) == 5
+    assert _posicion(1, 2) is None
+
+
+@pytest.mark.parametrize('valor', [2.9, 3.0, True, '3.5', 'tres'])
+def test_json_rechaza_posiciones_no_enteras(admin, valor):
+    antes = _posicion(1, 1)
+    respuesta = admin.put(URL, json={'preguntas': [1], 'candidatos': [1], 'posiciones': [[valor]]})
+
+    assert respuesta.status_code == 400
+    assert _posicion(1, 1) == antes
+
+
+@pytest.mark.parametrize('valor', ['3.5', '3.0', 'tres'])
+def test_csv_rechaza_posiciones_no_enteras(admin, valor):
+    antes = _posicion(1, 1)
+    respuesta = admin.put(URL, data=f'pregunta_id,pregunta,1\n1,texto,{valor}\n', content_type='text/csv')
+
+    assert respuesta.status_code == 400
+    assert _posicion(1, 1) == antes
+
+
+@pytest.mark.parametrize('matriz', [
+    {'preguntas': [1], 'candidatos': [1], 'posiciones': [[7]]},
+    {'preguntas': [1], 'candidatos': [99], 'posiciones': [[3]]},
+    {'preguntas': [1], 'candidatos': [1, 2], 'posiciones': [[3]]},
+])
+def test_rechaza_matriz_invalida_sin_guardar_nada(admin, matriz):
+    antes = admin.get(URL).get_json()['posiciones']
+
+    assert admin.put(URL, json=matriz).status_code == 400
+    assert admin.get(URL).get_json()['posiciones'] == antes
+
+
+def test_forma_compacta_incluye_nombres(admin):
+    matriz = admin.get('/api/admin/respuestas', query_string={'format': 'matrix'}).get_json()
+
+    assert matriz['candidatos'] == [1, 2]
+    assert matriz['nombres'] == ['José Antonio Kast', 'Gabriel Boric']
+    assert 'textos' not in matriz
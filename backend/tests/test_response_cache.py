@@ -0,0 +1,48 @@
+"""Caché de respuestas versionada (response_cache.py)"""
+import response_cache
+
+
+def test_parametros_que_la_vista_no_lee_no_crean_entradas(client):
+    for i in range(20):
+        assert client.get('/api/candidatos', query_string={'x': i}).status_code == 200
+
+    assert len(response_cache._cache) == 1
+
+
+def test_fields_se_normaliza(client):
+    primera = client.get('/api/candidatos', query_string={'fields': 'partido,nombre'})
+    segunda = client.get('/api/candidatos', query_string={'fields': ' nombre,partido,nombre'})
+
+    assert primera.get_json() == segunda.get_json()
+    assert primera.headers['ETag'] == segunda.headers['ETag']
+    assert len(response_cache._cache) == 1
+    assert client.get('/api/candidatos').headers['ETag'] != primera.headers['ETag']
+
+
+def test_respuestas_de_error_no_se_cachean(client):
+    assert client.get('/api/candidatos', query_string={'fields': 'nada'}).status_code == 400
+    assert client.get('/api/candidatos/99').status_code == 404
+
+    assert len(response_cache._cache) == 0
+
+
+def test_304_con_etag_de_la_misma_clave(client):
+    etag = client.get('/api/candidatos', query_string={'fields': 'nombre'}).headers['ETag']
+
+    respuesta = client.get('/api/candidatos', query_string={'fields': 'nombre', 'x': 1},
+                           headers={'If-None-Match': etag})
+    assert respuesta.status_code == 304
+
+
+def test_al_llenarse_descarta_la_menos_usada(client, monkeypatch):
+    monkeypatch.setattr(response_cache, 'MAX_ENTRIES', 2)
+
+    client.get('/api/candidatos/1')
+    client.get('/api/candidatos/2')
+    client.get('/api/candidatos/1')       # la 1 pasa a ser la más reciente
+    client.get('/api/quiz/preguntas')     # desplaza a la 2
+
+    claves = list(response_cache._cache)
+    assert len(claves) == 2
+    assert any("'id', 1" in c for c in claves)
+    assert not any("'id', 2" in c for c in claves)
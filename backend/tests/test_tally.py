@@ -0,0 +1,82 @@
+"""Contadores de votos (tally.py) y su construcción al actualizar el esquema"""
+from sqlalchemy import inspect, text
+
+from conftest import votar
+from models import db, ConteoVoto, SerieVoto
+import schema
+import tally
+
+
+def _conteos():
+    return dict(db.session.query(ConteoVoto.candidato_id, ConteoVoto.votos).all())
+
+
+def test_votar_actualiza_contadores(client):
+    assert votar(client, 1, 'a').status_code == 201
+    assert votar(client, 1, 'b').status_code == 201
+    assert votar(client, 2, 'c').status_code == 201
+
+    assert _conteos() == {1: 2, 2: 1}
+    resultados = client.get('/api/resultados').get_json()
+    assert resultados['total_votos'] == 3
+    assert [r['votos'] for r in resultados['resultados']] == [2, 1]
+
+
+def test_voto_repetido_no_suma(client):
+    assert votar(client, 1, 'a').status_code == 201
+    assert votar(client, 2, 'a').status_code == 403
+
+    assert _conteos() == {1: 1}
+
+
+def test_reconcile_corrige_contadores(client):
+    for i in range(3):
+        votar(client, 1 + i % 2, f'ip{i}')
+    db.session.execute(text('UPDATE conteo_votos SET votos = 99'))
+    db.session.execute(text('DELETE FROM serie_votos'))
+    db.session.commit()
+
+    assert tally.reconcile() == 3
+    assert _conteos() == {1: 2, 2: 1}
+    assert sum(s.votos for s in SerieVoto.query.filter_by(granularidad='day')) == 3
+
+
+def _esquema_anterior():
+    """Deja la base como antes de contadores, serie y rondas, con votos"""
+    for sql in (
+        'DROP TABLE conteo_votos',
+        'DROP TABLE serie_votos',
+        'DROP INDEX uq_votos_ronda_ip_hash',
+        'ALTER TABLE votos DROP COLUMN ronda',
+        'ALTER TABLE configuracion DROP COLUMN ronda_actual',
+    ):
+        db.session.execute(text(sql))
+    for i, candidato_id in enumerate((1, 1, 2, 1, 2)):
+        db.session.execute(text(
+            "INSERT INTO votos (candidato_id, ip_hash, timestamp) "
+            "VALUES (:c, :h, '2025-11-16 20:00:00')"
+        ), {'c': candidato_id, 'h': f'ip{i}'})
+    db.session.commit()
+
+
+def test_upgrade_construye_contadores_de_votos_existentes(client):
+    _esquema_anterior()
+
+    schema.upgrade(log=lambda mensaje: None)
+
+    assert inspect(db.engine).has_table('conteo_votos')
+    assert _conteos() == {1: 3, 2: 2}
+    assert sum(s.votos for s in SerieVoto.query.filter_by(granularidad='day')) == 5
+    assert client.get('/api/resultados').get_json()['total_votos'] == 5
+    # Los votos existentes quedan en la ronda 1 y cuentan para el índice único
+    assert votar(client, 1, 'ip0').status_code == 403
+
+
+def test_upgrade_no_recuenta_si_ya_hay_contadores(client):
+    votar(client, 1, 'a')
+    db.session.execute(text('UPDATE conteo_votos SET votos = 7'))
+    db.session.commit()
+
+    schema.upgrade(log=lambda mensaje: None)
+
+    assert _conteos() == {1: 7}
@@ -0,0 +1,60 @@
+"""Rondas de votación (vote_rounds.py): reinicio, ronda nueva y archivadas"""
+from conftest import votar
+from models import Voto
+
+
+def _votos(resultados):
+    return [r['votos'] for r in resultados['resultados']]
+
+
+def test_ronda_nueva_archiva_la_anterior(client, admin):
+    votar(client, 1, 'a')
+    votar(client, 1, 'b')
+    votar(client, 2, 'c')
+
+    respuesta = admin.post('/api/admin/rondas')
+    assert respuesta.status_code == 201
+    assert respuesta.get_json()['ronda'] == 2
+    assert client.get('/api/config').get_json()['ronda'] == 2
+
+    # La ronda abierta empieza vacía y la archivada conserva sus votos
+    assert client.get('/api/resultados').get_json()['total_votos'] == 0
+    archivada = client.get('/api/resultados', query_string={'ronda': 1}).get_json()
+    assert archivada['total_votos'] == 3
+    assert _votos(archivada) == [2, 1]
+
+
+def test_se_puede_votar_otra_vez_en_la_ronda_nueva(client, admin):
+    assert votar(client, 1, 'a').status_code == 201
+    admin.post('/api/admin/rondas')
+
+    assert votar(client, 2, 'a').status_code == 201
+    assert votar(client, 2, 'a').status_code == 403
+    assert sorted((v.ronda, v.candidato_id) for v in Voto.query.all()) == [(1, 1), (2, 2)]
+
+
+def test_reiniciar_solo_borra_la_ronda_abierta(client, admin):
+    votar(client, 1, 'a')
+    admin.post('/api/admin/rondas')
+    votar(client, 2, 'b')
+
+    respuesta = admin.post('/api/admin/reset-votes')
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['ronda'] == 2
+
+    assert client.get('/api/resultados').get_json()['total_votos'] == 0
+    assert client.get('/api/resultados', query_string={'ronda': 1}).get_json()['total_votos'] == 1
+    assert votar(client, 1, 'b').status_code == 201
+
+
+def test_ronda_inexistente(client, admin):
+    admin.post('/api/admin/rondas')
+
+    assert client.get('/api/resultados', query_string={'ronda': 2}).status_code == 200
+    assert client.get('/api/resultados', query_string={'ronda': 3}).status_code == 404
+    assert client.get('/api/resultados', query_string={'ronda': 0}).status_code == 404
+
+
+def test_rondas_requiere_admin(client):
+    assert client.post('/api/admin/rondas').status_code == 401
+    assert client.get('/api/config').get_json()['ronda'] == 1
@@ -0,0 +1,341 @@
+"""
+Ingesta diferida (write-behind) de votos
+
+Modo opcional para noches de debate: cada voto se confirma al cliente en
+cuanto queda escrito en un archivo local de solo-anexado (spool) y un hilo
+por worker lo vuelca a `votos` en INSERTs multi-fila cada N ms o M votos.
+
+Activación por variables de entorno:
+    VOTE_INGESTION=buffered          ('direct' por defecto)
+    VOTE_BUFFER_DIR=/var/lib/encuestas/vote-buffer
+    VOTE_BUFFER_BATCH=500            (M votos por lote)
+    VOTE_BUFFER_INTERVAL_MS=200      (N ms entre volcados)
+    VOTE_BUFFER_FSYNC=true           (fsync por voto antes de responder)
+
+Cada worker escribe en su propio archivo y mantiene un flock exclusivo
+sobre él. Si un worker muere, otro worker toma el lock y vuelca los votos
+que quedaron pendientes (al iniciar y luego cada RECOVERY_INTERVAL).
+
+Un voto repetido solo se detecta al recibirlo si el primero ya está en la
+base de datos o pendiente en el mismo worker. Si el primero sigue en el
+spool de otro worker, el repetido también recibe 202 y se descarta al
+volcar (ON CONFLICT sobre el índice único de la ronda): cuenta como
+`duplicates_dropped` y nunca suma dos votos.
+
+Las métricas por worker están en stats() y, sumadas entre workers, en
+las métricas de Prometheus (`encuestas_vote_buffer_*`, metrics.py).
+"""
+import atexit
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from models import db, Voto, RONDA_ACTUAL
+from db_utils import dialect_insert
+import tally
+import catalog
+import metrics
+
+# Cada cuánto se buscan spools abandonados por workers caídos (segundos)
+RECOVERY_INTERVAL = 30
+
+class VoteBuffer:
+    """Buffer durable de votos con volcado por lotes"""
+
+    def __init__(self, directory, batch_size=500, interval_ms=200, fsync=True):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000.0
+        self.fsync = fsync
+        self.app = None
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._file = None
+        self._seq = 0
+        self._pending = []            # [(candidato_id, ip_hash, timestamp, acked_at)]
+        self._pending_hashes = set()
+        self._retries = []            # spools cuyo volcado falló
+        self._thread = None
+        self._pid = None
+
+        self._stats = {
+            'flushes': 0,
+            'votes_flushed': 0,
+            'duplicates_dropped': 0,
+            'invalid_dropped': 0,
+            'recovered': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'last_lag_ms': 0.0,
+            'max_lag_ms': 0.0,
+            'last_flush_at': None,
+            'last_error': None,
+        }
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['vote_buffer'] = self
+        os.makedirs(self.directory, exist_ok=True)
+
+    # ---------- API pública ----------
+
+    def submit(self, candidato_id, ip_hash):
+        """
+        Registra un voto en el spool local.
+
+        Returns:
+            False si el votante ya votó (en BD o pendiente en este worker).
+            Un voto pendiente en otro worker no se ve aquí: el repetido se
+            acepta y se descarta al volcar (ver docstring del módulo)
+        """
+        self._ensure_started()
+
+        with self._lock:
+            if ip_hash in self._pending_hashes:
+                return False
+        if Voto.query.filter(Voto.ronda == RONDA_ACTUAL, Voto.ip_hash == ip_hash).first():
+            return False
+
+        ahora = datetime.utcnow()
+        linea = json.dumps({
+            'candidato_id': candidato_id,
+            'ip_hash': ip_hash,
+            'timestamp': ahora.isoformat()
+        }) + '\n'
+
+        with self._lock:
+            if ip_hash in self._pending_hashes:
+                return False
+            self._file.write(linea)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._pending.append((candidato_id, ip_hash, ahora, time.monotonic()))
+            self._pending_hashes.add(ip_hash)
+            lleno = len(self._pending) >= self.batch_size
+            metrics.record_buffer_pending(len(self._pending))
+
+        if lleno:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Vuelca al instante los votos pendientes de este worker"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            entries = self._pending
+            old_file = self._file
+            self._pending = []
+            self._pending_hashes = set()
+            self._file = self._open_spool()
+            metrics.record_buffer_pending(0)
+
+        try:
+            with self.app.app_context():
+                self._persist([(c, h, t) for c, h, t, _ in entries])
+        except Exception as e:
+            # El archivo antiguo queda en disco (y con su lock) hasta reintentar
+            self._stats['last_error'] = str(e)
+            self.app.logger.error('Error volcando votos: %s', e)
+            metrics.record_buffer_error()
+            self._retry_later(old_file)
+            return 0
+
+        lag_ms = (time.monotonic() - entries[0][3]) * 1000
+        metrics.record_buffer_flush(len(entries), lag_ms / 1000)
+        self._stats['flushes'] += 1
+        self._stats['last_batch_size'] = len(entries)
+        self._stats['max_batch_size'] = max(self._stats['max_batch_size'], len(entries))
+        self._stats['last_lag_ms'] = round(lag_ms, 2)
+        self._stats['max_lag_ms'] = max(self._stats['max_lag_ms'], round(lag_ms, 2))
+        self._stats['last_flush_at'] = datetime.utcnow().isoformat()
+        self._stats['last_error'] = None
+
+        self._discard(old_file)
+        return len(entries)
+
+    def stats(self):
+        """Métricas del buffer en este worker"""
+        with self._lock:
+            pendientes = len(self._pending)
+        return dict(self._stats, pid=os.getpid(), pending=pendientes,
+                    batch_size=self.batch_size, interval_ms=int(self.interval * 1000))
+
+    # ---------- Internos ----------
+
+    def _ensure_started(self):
+        # Se inicia de forma perezosa para no compartir hilos ni archivos
+        # entre el proceso maestro de gunicorn y los workers (fork)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._pending = []
+            self._pending_hashes = set()
+            self._retries = []
+            self._file = self._open_spool()
+            self._thread = threading.Thread(target=self._run, name='vote-buffer', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _open_spool(self):
+        self._seq += 1
+        nombre = f'votos-{os.getpid()}-{int(time.time() * 1000)}-{self._seq}.log'
+        f = open(os.path.join(self.directory, nombre), 'a+', encoding='utf-8')
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return f
+
+    def _discard(self, f):
+        # Primero unlink y luego close: quien espere el lock verá el archivo ya borrado
+        try:
+            os.unlink(f.name)
+        except FileNotFoundError:
+            pass
+        f.close()
+
+    def _retry_later(self, f):
+        with self._lock:
+            self._retries.append(f)
+
+    def _run(self):
+        self._recover_orphans()
+        ultima_recuperacion = time.monotonic()
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+            if self._retries:
+                self._flush_retries()
+            if time.monotonic() - ultima_recuperacion > RECOVERY_INTERVAL:
+                self._recover_orphans()
+                ultima_recuperacion = time.monotonic()
+
+    def _flush_retries(self):
+        with self._lock:
+            archivos = self._retries
+            self._retries = []
+        for f in archivos:
+            if self._replay(f):
+                self._discard(f)
+            else:
+                self._retry_later(f)
+
+    def _recover_orphans(self):
+        """Vuelca spools de workers que murieron sin volcar sus votos"""
+        # Los spools propios (y los de workers vivos) tienen flock tomado
+        for path in glob.glob(os.path.join(self.directory, 'votos-*.log')):
+            try:
+                f = open(path, 'r+', encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Otro worker vivo es dueño del archivo
+                f.close()
+                continue
+            if os.fstat(f.fileno()).st_nlink == 0:
+                # El dueño lo volcó y borró mientras esperábamos el lock
+                f.close()
+                continue
+            if self._replay(f):
+                self._stats['recovered'] += 1
+                metrics.record_buffer_recovered()
+                self._discard(f)
+            else:
+                f.close()
+
+    def _replay(self, f):
+        """Relee un spool desde disco y persiste su contenido"""
+        try:
+            f.seek(0)
+            entries = []
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    d = json.loads(linea)
+                except ValueError:
+                    # Línea truncada por una caída a mitad de escritura
+                    continue
+                entries.append((d['candidato_id'], d['ip_hash'], datetime.fromisoformat(d['timestamp'])))
+            with self.app.app_context():
+                self._persist(entries)
+            return True
+        except Exception as e:
+            self._stats['last_error'] = str(e)
+            self.app.logger.error('Error recuperando spool %s: %s', f.name, e)
+            metrics.record_buffer_error()
+            return False
+
+    def _persist(self, entries):
+        """
+        Inserta un lote de votos en la ronda abierta con un único INSERT
+        multi-fila (ON CONFLICT (ronda, ip_hash) DO NOTHING) y actualiza los
+        contadores en la misma transacción solo con las filas realmente
+        insertadas.
+        Descarta votantes repetidos y candidatos inexistentes.
+        """
+        if not entries:
+            return
+
+        candidatos_validos = catalog.get_snapshot().candidatos_por_id
+
+        filas = []
+        vistos = set()
+        invalidos = repetidos = 0
+        for candidato_id, ip_hash, timestamp in entries:
+            if candidato_id not in candidatos_validos or ip_hash is None:
+                invalidos += 1
+                continue
+            if ip_hash in vistos:
+                repetidos += 1
+                continue
+            vistos.add(ip_hash)
+            filas.append({'candidato_id': candidato_id, 'ip_hash': ip_hash, 'timestamp': timestamp})
+
+        insertados = 0
+        if filas:
+            tabla = Voto.__table__
+            stmt = dialect_insert(tabla).values(filas).on_conflict_do_nothing(
+                index_elements=[tabla.c.ronda, tabla.c.ip_hash]
+            ).returning(tabla.c.candidato_id, tabla.c.timestamp)
+
+            nuevos = [tuple(f) for f in db.session.execute(stmt)]
+            insertados = len(nuevos)
+            tally.record_votes(nuevos)
+
+        db.session.commit()
+        repetidos += len(filas) - insertados
+        self._stats['invalid_dropped'] += invalidos
+        self._stats['duplicates_dropped'] += repetidos
+        self._stats['votes_flushed'] += insertados
+        metrics.record_buffer_persisted(insertados, repetidos, invalidos)
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+
+def create_vote_buffer(app):
+    """Crea el buffer si VOTE_INGESTION=buffered; si no, devuelve None"""
+    if os.getenv('VOTE_INGESTION', 'direct') != 'buffered':
+        return None
+
+    buffer = VoteBuffer(
+        directory=os.getenv('VOTE_BUFFER_DIR', '/var/lib/encuestas/vote-buffer'),
+        batch_size=int(os.getenv('VOTE_BUFFER_BATCH', 500)),
+        interval_ms=int(os.getenv('VOTE_BUFFER_INTERVAL_MS', 200)),
+        fsync=_env_bool('VOTE_BUFFER_FSYNC', True)
+    )
+    buffer.init_app(app)
+    return buffer
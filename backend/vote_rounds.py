@@ -0,0 +1,149 @@
+"""
+Rondas de votación
+
+Cada voto pertenece a la ronda abierta en `configuracion.ronda_actual`
+(ver RONDA_ACTUAL en models.py). En PostgreSQL `votos` está particionada
+por ronda (votos_r1, votos_r2, ...), así que:
+
+    - reiniciar la ronda actual es un TRUNCATE de su partición
+    - abrir una ronda nueva crea la partición siguiente y cambia la ronda
+      abierta; la anterior queda archivada y se sigue consultando
+
+Ambas operaciones tardan lo mismo con mil o con millones de votos. Los
+contadores (conteo_votos) y la serie temporal son siempre los de la ronda
+abierta; los resultados de rondas archivadas se calculan desde su
+partición y se memorizan, porque ya no cambian.
+
+En SQLite (desarrollo) la tabla no se particiona y se borra por ronda.
+"""
+import threading
+
+from sqlalchemy import delete, func, text
+from models import db, Configuracion, Voto
+from db_utils import is_postgresql
+import catalog
+import content_version
+
+# Espera máxima por el lock de votos al reiniciar o cambiar de ronda
+LOCK_TIMEOUT = '5s'
+
+_memo_lock = threading.Lock()
+_resultados_archivados = {}  # {(ronda, version_catalogo): resultados}
+
+
+def current():
+    """Número de la ronda abierta"""
+    ronda = db.session.query(Configuracion.ronda_actual).order_by(Configuracion.id).limit(1).scalar()
+    return ronda or 1
+
+
+def partition_name(ronda):
+    return f'votos_r{int(ronda)}'
+
+
+def is_partitioned():
+    """True si `votos` es una tabla particionada (PostgreSQL ya migrado)"""
+    if not is_postgresql():
+        return False
+    return db.session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('votos'))"
+    )).scalar()
+
+
+def ensure_partition(ronda):
+    """Crea la partición de una ronda si falta (sin commit)"""
+    if is_partitioned():
+        db.session.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {partition_name(ronda)} '
+            f'PARTITION OF votos FOR VALUES IN ({int(ronda)})'
+        ))
+
+
+def _lock_votos():
+    # Espera a los votos en curso y frena los nuevos hasta el commit
+    db.session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+    db.session.execute(text('LOCK TABLE votos IN ACCESS EXCLUSIVE MODE'))
+
+
+def reset_current():
+    """
+    Elimina los votos de la ronda abierta junto con sus contadores y serie
+    (sin commit). Con lock_timeout: si hay una exportación en curso falla
+    con OperationalError en lugar de frenar la votación indefinidamente.
+    """
+    import tally
+
+    ronda = current()
+    if is_partitioned():
+        _lock_votos()
+        db.session.execute(text(f'TRUNCATE {partition_name(ronda)}'))
+    else:
+        db.session.execute(delete(Voto).where(Voto.ronda == ronda))
+    tally.reset_tally()
+    return ronda
+
+
+def start_new():
+    """
+    Archiva la ronda abierta y abre la siguiente (sin commit)
+
+    Returns:
+        Número de la ronda nueva
+    """
+    import tally
+
+    if is_postgresql():
+        _lock_votos()
+    config = Configuracion.query.order_by(Configuracion.id).first()
+    if not config:
+        config = Configuracion()
+        db.session.add(config)
+    ronda = (config.ronda_actual or 1) + 1
+    config.ronda_actual = ronda
+    ensure_partition(ronda)
+    tally.reset_tally()
+    content_version.bump(content_version.CONFIG)
+    return ronda
+
+
+def delete_all():
+    """Elimina los votos de todas las rondas (datos de ejemplo, sin commit)"""
+    if is_partitioned():
+        db.session.execute(text('TRUNCATE votos'))
+    else:
+        db.session.execute(delete(Voto))
+
+
+def get_resultados(ronda):
+    """
+    Resultados de una ronda: la abierta sale de los contadores, las
+    archivadas de un GROUP BY sobre su partición (memorizado)
+
+    Returns:
+        Dict como /api/resultados, o None si la ronda no existe
+    """
+    import tally
+
+    actual = current()
+    if ronda == actual:
+        return tally.build_resultados()
+    if not 1 <= ronda < actual:
+        return None
+
+    clave = (ronda, content_version.get_cached(content_version.CATALOGO))
+    with _memo_lock:
+        if clave in _resultados_archivados:
+            return _resultados_archivados[clave]
+
+    votos = dict(db.session.query(Voto.candidato_id, func.count(Voto.id)).filter(
+        Voto.ronda == ronda
+    ).group_by(Voto.candidato_id).all())
+    conteos = [(c.id, c.nombre, votos.get(c.id, 0)) for c in catalog.get_snapshot().candidatos]
+    resultados = tally.format_resultados(sum(f[2] for f in conteos), conteos)
+
+    with _memo_lock:
+        # Las entradas de versiones anteriores del catálogo ya no sirven
+        for vieja in [k for k in _resultados_archivados if k[1] != clave[1]]:
+            del _resultados_archivados[vieja]
+        _resultados_archivados[clave] = resultados
+    return resultados
@@ -0,0 +1,131 @@
+"""
+Serie temporal de votos
+
+Mantiene en `serie_votos` los votos de cada candidato por minuto, hora y
+día en la ronda abierta. Los intervalos se actualizan en la misma transacción que cada voto
+(ver tally.record_votes), así que /api/resultados/serie lee una cantidad
+acotada de filas sin importar cuántos votos existan.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, literal, select, func
+from models import db, Voto, SerieVoto
+from db_utils import dialect_insert, is_postgresql
+import catalog
+
+# Paso de cada granularidad y cantidad de intervalos que se devuelven por defecto
+GRANULARIDADES = {
+    'minute': (timedelta(minutes=1), 120),
+    'hour': (timedelta(hours=1), 48),
+    'day': (timedelta(days=1), 90),
+}
+MAX_BUCKETS = 1000
+
+# Truncado equivalente en SQLite, con el mismo formato con que SQLAlchemy guarda DateTime
+_FORMATO_SQLITE = {
+    'minute': '%Y-%m-%d %H:%M:00.000000',
+    'hour': '%Y-%m-%d %H:00:00.000000',
+    'day': '%Y-%m-%d 00:00:00.000000',
+}
+
+
+def truncate(timestamp, granularidad):
+    """Inicio del intervalo que contiene `timestamp`"""
+    if granularidad == 'minute':
+        return timestamp.replace(second=0, microsecond=0)
+    if granularidad == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def record(votos):
+    """
+    Suma votos a los intervalos correspondientes, dentro de la transacción actual
+
+    Args:
+        votos: iterable de (candidato_id, timestamp)
+    """
+    conteo = {}
+    for candidato_id, timestamp in votos:
+        for granularidad in GRANULARIDADES:
+            clave = (granularidad, truncate(timestamp, granularidad), candidato_id)
+            conteo[clave] = conteo.get(clave, 0) + 1
+    if not conteo:
+        return
+
+    # Orden fijo de filas para que lotes concurrentes no se bloqueen mutuamente
+    filas = [
+        {'granularidad': g, 'bucket': b, 'candidato_id': c, 'votos': n}
+        for (g, b, c), n in sorted(conteo.items())
+    ]
+    tabla = SerieVoto.__table__
+    stmt = dialect_insert(tabla).values(filas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tabla.c.granularidad, tabla.c.bucket, tabla.c.candidato_id],
+        set_={'votos': tabla.c.votos + stmt.excluded.votos}
+    )
+    db.session.execute(stmt)
+
+
+def reset():
+    """Elimina la serie completa (usar junto al borrado de votos)"""
+    db.session.execute(delete(SerieVoto))
+
+
+def _truncate_sql(columna, granularidad):
+    if is_postgresql():
+        return func.date_trunc(granularidad, columna)
+    return func.strftime(_FORMATO_SQLITE[granularidad], columna)
+
+
+def rebuild(ronda):
+    """Reconstruye la serie desde los votos de una ronda (sin commit)"""
+    reset()
+    for granularidad in GRANULARIDADES:
+        bucket = _truncate_sql(Voto.timestamp, granularidad)
+        db.session.execute(
+            insert(SerieVoto).from_select(
+                ['granularidad', 'bucket', 'candidato_id', 'votos'],
+                select(literal(granularidad), bucket, Voto.candidato_id, func.count(Voto.id))
+                .where(Voto.ronda == ronda, Voto.timestamp.isnot(None))
+                .group_by(bucket, Voto.candidato_id)
+            )
+        )
+
+
+def get_serie(granularidad, buckets=None):
+    """
+    Votos por candidato en los últimos `buckets` intervalos
+
+    Returns:
+        Dict con la lista de intervalos y, por candidato, los votos de cada uno
+    """
+    paso, por_defecto = GRANULARIDADES[granularidad]
+    cantidad = max(1, min(buckets or por_defecto, MAX_BUCKETS))
+    hasta = truncate(datetime.utcnow(), granularidad)
+    desde = hasta - paso * (cantidad - 1)
+
+    intervalos = [desde + paso * i for i in range(cantidad)]
+    posicion = {b: i for i, b in enumerate(intervalos)}
+    candidatos = catalog.get_snapshot().candidatos
+    votos = {c.id: [0] * cantidad for c in candidatos}
+
+    filas = db.session.query(SerieVoto.bucket, SerieVoto.candidato_id, SerieVoto.votos).filter(
+        SerieVoto.granularidad == granularidad,
+        SerieVoto.bucket >= desde
+    ).all()
+    for bucket, candidato_id, n in filas:
+        i = posicion.get(bucket)
+        if i is not None and candidato_id in votos:
+            votos[candidato_id][i] = n
+
+    return {
+        'granularity': granularidad,
+        'buckets': [b.isoformat() for b in intervalos],
+        'totales': [sum(v[i] for v in votos.values()) for i in range(cantidad)],
+        'series': [{
+            'candidato_id': c.id,
+            'nombre': c.nombre,
+            'votos': votos[c.id]
+        } for c in candidatos]
+    }
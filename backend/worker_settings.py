@@ -0,0 +1,84 @@
+"""
+Modo de worker de gunicorn y tamaño del pool de conexiones
+
+Lo comparten gunicorn_config.py (para lanzar los workers) y app.py (para
+dimensionar el pool de SQLAlchemy de cada worker), de modo que ambos se
+derivan de las mismas variables de entorno:
+
+    GUNICORN_WORKER_CLASS        sync | gthread | gevent   (gevent por defecto)
+    GUNICORN_WORKERS             procesos (2 x CPUs + 1 por defecto)
+    GUNICORN_THREADS             hilos por proceso en gthread (8)
+    GUNICORN_WORKER_CONNECTIONS  conexiones simultáneas por proceso en gevent (100)
+    DB_MAX_CONNECTIONS           conexiones a Postgres que puede usar la app
+                                 entre todos los workers (90)
+    RESULTS_STREAM_MAX_SUBSCRIBERS  clientes SSE por proceso (la mitad de la
+                                 concurrencia del worker; 0 en sync)
+"""
+import multiprocessing
+import os
+
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+
+
+def worker_class():
+    clase = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+    if clase not in WORKER_CLASSES:
+        raise ValueError(f'GUNICORN_WORKER_CLASS inválido: {clase} (usar {", ".join(WORKER_CLASSES)})')
+    return clase
+
+
+def workers():
+    return int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+
+def threads():
+    return int(os.getenv('GUNICORN_THREADS', 8)) if worker_class() == 'gthread' else 1
+
+
+def worker_connections():
+    return int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 100))
+
+
+def concurrency_per_worker():
+    """Peticiones que un worker puede atender a la vez"""
+    clase = worker_class()
+    if clase == 'gthread':
+        return threads()
+    if clase == 'gevent':
+        return worker_connections()
+    return 1
+
+
+def stream_subscribers():
+    """
+    Clientes de /api/resultados/stream que acepta cada worker
+
+    Cada cliente SSE ocupa un hilo (gthread) o un greenlet (gevent) mientras
+    está conectado; con la mitad como tope siempre quedan lugares libres
+    para votar y el resto del sitio. En sync no se acepta ninguno.
+    """
+    if worker_class() == 'sync':
+        return 0
+    por_defecto = max(1, concurrency_per_worker() // 2)
+    return int(os.getenv('RESULTS_STREAM_MAX_SUBSCRIBERS', por_defecto))
+
+
+def db_pool_limits():
+    """
+    Tamaño del pool de SQLAlchemy por worker
+
+    Cada worker necesita tantas conexiones como peticiones simultáneas
+    (más una para los hilos de fondo: resultados en vivo e ingesta diferida),
+    pero entre todos los workers no se debe superar DB_MAX_CONNECTIONS.
+    DB_POOL_SIZE y DB_MAX_OVERFLOW fijan los valores a mano.
+
+    Returns:
+        Tupla (pool_size, max_overflow)
+    """
+    presupuesto = max(1, int(os.getenv('DB_MAX_CONNECTIONS', 90)) // workers())
+    deseado = concurrency_per_worker() + 1
+
+    pool_size = int(os.getenv('DB_POOL_SIZE', min(deseado, presupuesto)))
+    # El desborde solo usa lo que quede del presupuesto del worker
+    max_overflow = int(os.getenv('DB_MAX_OVERFLOW', max(0, presupuesto - pool_size)))
+    return pool_size, max_overflow
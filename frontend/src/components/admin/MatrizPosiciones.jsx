@@ -0,0 +1,109 @@
+import { useState, useEffect } from 'react';
+import { FiSave } from 'react-icons/fi';
+import adminApi from '../../services/adminApi';
+
+// Posición de cada candidato (columnas) en cada pregunta (filas), 1 a 5
+const MatrizPosiciones = ({ preguntas }) => {
+  const [matriz, setMatriz] = useState(null);
+  const [modificada, setModificada] = useState(false);
+  const [saving, setSaving] = useState(false);
+
+  useEffect(() => {
+    loadMatriz();
+  }, [preguntas]);
+
+  const loadMatriz = async () => {
+    try {
+      const response = await adminApi.getRespuestasMatriz();
+      setMatriz(response.data);
+      setModificada(false);
+    } catch (error) {
+      console.error('Error loading matriz:', error);
+    }
+  };
+
+  const handleChange = (fila, columna, valor) => {
+    const posiciones = matriz.posiciones.map((f) => [...f]);
+    posiciones[fila][columna] = valor === '' ? null : parseInt(valor);
+    setMatriz({ ...matriz, posiciones });
+    setModificada(true);
+  };
+
+  const handleSave = async () => {
+    setSaving(true);
+    try {
+      // Las celdas en "–" (null) borran la respuesta guardada
+      await adminApi.saveMatrizRespuestas(matriz);
+      setModificada(false);
+    } catch (error) {
+      console.error('Error saving matriz:', error);
+      alert(error.response?.data?.error || 'Error al guardar posiciones');
+    } finally {
+      setSaving(false);
+    }
+  };
+
+  if (!matriz || matriz.preguntas.length === 0) {
+    return null;
+  }
+
+  const textos = Object.fromEntries(preguntas.map((p) => [p.id, p.texto]));
+
+  return (
+    <div className="bg-white rounded-lg shadow-md overflow-hidden">
+      <div className="flex justify-between items-center p-6">
+        <div>
+          <h2 className="text-lg font-semibold text-gray-800">Posiciones de los Candidatos</h2>
+          <p className="text-sm text-gray-600">1 = Muy en desacuerdo, 5 = Muy de acuerdo</p>
+        </div>
+        <button
+          onClick={handleSave}
+          disabled={!modificada || saving}
+          className="bg-blue-600 hover:bg-blue-700 disabled:opacity-50 text-white px-4 py-2 rounded-lg flex items-center space-x-2 transition"
+        >
+          <FiSave />
+          <span>{saving ? 'Guardando...' : 'Guardar Posiciones'}</span>
+        </button>
+      </div>
+      <div className="overflow-x-auto">
+        <table className="w-full">
+          <thead className="bg-gray-50">
+            <tr>
+              <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                Pregunta
+              </th>
+              {matriz.candidatos.map((id, columna) => (
+                <th key={id} className="px-4 py-3 text-center text-xs font-medium text-gray-500 uppercase tracking-wider">
+                  {matriz.nombres[columna] || id}
+                </th>
+              ))}
+            </tr>
+          </thead>
+          <tbody className="bg-white divide-y divide-gray-200">
+            {matriz.preguntas.map((preguntaId, fila) => (
+              <tr key={preguntaId} className="hover:bg-gray-50">
+                <td className="px-6 py-3 text-sm text-gray-900">{textos[preguntaId]}</td>
+                {matriz.posiciones[fila].map((posicion, columna) => (
+                  <td key={matriz.candidatos[columna]} className="px-4 py-3 text-center">
+                    <select
+                      value={posicion ?? ''}
+                      onChange={(e) => handleChange(fila, columna, e.target.value)}
+                      className="px-2 py-1 border border-gray-300 rounded focus:ring-2 focus:ring-blue-500"
+                    >
+                      <option value="">–</option>
+                      {[1, 2, 3, 4, 5].map((n) => (
+                        <option key={n} value={n}>{n}</option>
+                      ))}
+                    </select>
+                  </td>
+                ))}
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  );
+};
+
+export default MatrizPosiciones;
@@ -14,7 +14,9 @@ const LineaTiempo = () => {
 
   const fetchCandidatos = async () => {
     try {
-      const response = await axios.get('/api/candidatos')
+      const response = await axios.get('/api/candidatos', {
+        params: { fields: 'nombre,partido,biografia,linea_tiempo' },
+      })
       setCandidatos(response.data)
     } catch (error) {
       console.error('Error al cargar candidatos:', error)
@@ -9,6 +9,8 @@ const Noticias = () => {
   const [updating, setUpdating] = useState(false)
   const [fuentes, setFuentes] = useState([])
   const [selectedSource, setSelectedSource] = useState(null)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     fetchNoticias()
@@ -20,7 +22,8 @@ const Noticias = () => {
     try {
       const params = selectedSource ? { source: selectedSource } : {}
       const response = await axios.get('/api/noticias', { params })
-      setNoticias(response.data)
+      setNoticias(response.data.noticias)
+      setNextCursor(response.data.next_cursor)
     } catch (error) {
       console.error('Error al cargar noticias:', error)
     } finally {
@@ -28,6 +31,21 @@ const Noticias = () => {
     }
   }
 
+  const cargarMas = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const params = selectedSource ? { source: selectedSource, cursor: nextCursor } : { cursor: nextCursor }
+      const response = await axios.get('/api/noticias', { params })
+      setNoticias((prev) => [...prev, ...response.data.noticias])
+      setNextCursor(response.data.next_cursor)
+    } catch (error) {
+      console.error('Error al cargar más noticias:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const fetchFuentes = async () => {
     try {
       const response = await axios.get('/api/noticias/fuentes')
@@ -40,8 +58,9 @@ const Noticias = () => {
   const actualizarNoticias = async () => {
     setUpdating(true)
     try {
+      // El servidor encola la actualización; las noticias llegan en unos segundos
       const response = await axios.post('/api/noticias/actualizar')
-      alert(`${response.data.nuevas} noticias nuevas agregadas`)
+      alert(response.data.message)
       fetchNoticias()
     } catch (error) {
       alert('Error al actualizar noticias')
@@ -173,7 +192,7 @@ const Noticias = () => {
               rel="noopener noreferrer"
               initial={{ opacity: 0, y: 30 }}
               animate={{ opacity: 1, y: 0 }}
-              transition={{ delay: 0.5 + index * 0.1, duration: 0.5 }}
+              transition={{ delay: 0.5 + (index % 20) * 0.1, duration: 0.5 }}
               className="block"
             >
               <div className="card-hover h-full flex flex-col">
@@ -225,6 +244,19 @@ const Noticias = () => {
         </motion.div>
       )}
 
+      {/* Paginación */}
+      {nextCursor && (
+        <div className="text-center mt-8">
+          <button
+            onClick={cargarMas}
+            disabled={loadingMore}
+            className="btn-secondary"
+          >
+            {loadingMore ? 'Cargando...' : 'Cargar más noticias'}
+          </button>
+        </div>
+      )}
+
       {/* Info adicional */}
       <motion.div
         initial={{ opacity: 0 }}
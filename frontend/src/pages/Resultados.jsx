@@ -14,12 +14,39 @@ const Resultados = () => {
 
   useEffect(() => {
     fetchResultados()
-    // Auto-refresh cada 30 segundos
-    const interval = setInterval(() => {
-      fetchResultados(true)
-    }, 30000)
 
-    return () => clearInterval(interval)
+    // Resultados en vivo vía SSE; si el navegador no lo soporta, auto-refresh cada 30 segundos
+    let interval = null
+    const startPolling = () => {
+      if (interval) return
+      interval = setInterval(() => {
+        fetchResultados(true)
+      }, 30000)
+    }
+
+    if (typeof EventSource === 'undefined') {
+      startPolling()
+      return () => clearInterval(interval)
+    }
+
+    const source = new EventSource('/api/resultados/stream')
+    source.onmessage = (event) => {
+      setResultados(JSON.parse(event.data))
+      setLoading(false)
+    }
+    source.onerror = (error) => {
+      // EventSource reconecta automáticamente salvo que el servidor rechace
+      // el stream (p. ej. 503 con workers sync): en ese caso se usa polling
+      console.error('Error en resultados en vivo:', error)
+      if (source.readyState === EventSource.CLOSED) {
+        startPolling()
+      }
+    }
+
+    return () => {
+      source.close()
+      if (interval) clearInterval(interval)
+    }
   }, [])
 
   const fetchResultados = async (isAutoRefresh = false) => {
@@ -289,7 +316,7 @@ const Resultados = () => {
         className="max-w-4xl mx-auto mt-12 text-center"
       >
         <p className="text-gray-600 italic">
-          Los resultados se actualizan automáticamente cada 30 segundos.
+          Los resultados se actualizan automáticamente en tiempo real.
           Esta es una encuesta informal y no representa resultados oficiales.
         </p>
       </motion.div>
@@ -20,7 +20,10 @@ const Votacion = () => {
 
   const fetchCandidatos = async () => {
     try {
-      const response = await axios.get('/api/candidatos')
+      // Solo los campos de la tarjeta (sin biografía ni línea de tiempo)
+      const response = await axios.get('/api/candidatos', {
+        params: { fields: 'nombre,partido,foto_url,programa' },
+      })
       setCandidatos(response.data)
     } catch (error) {
       console.error('Error al cargar candidatos:', error)
@@ -9,7 +9,8 @@ const Configuracion = () => {
     election_title: '',
     election_type: '',
     site_name: '',
-    maintenance_mode: false
+    maintenance_mode: false,
+    ronda_actual: 1
   });
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
@@ -58,8 +59,28 @@ const Configuracion = () => {
     }
   };
 
+  const handleNuevaRonda = async () => {
+    if (window.confirm(`¿Cerrar la ronda ${config.ronda_actual} y abrir una nueva? Los resultados de la ronda actual quedarán archivados.`)) {
+      try {
+        const response = await adminApi.nuevaRonda();
+        setConfig({ ...config, ronda_actual: response.data.ronda });
+        setMessage({
+          type: 'success',
+          text: response.data.message
+        });
+        setTimeout(() => setMessage({ type: '', text: '' }), 3000);
+      } catch (error) {
+        console.error('Error opening round:', error);
+        setMessage({
+          type: 'error',
+          text: error.response?.data?.error || 'Error al abrir la nueva ronda'
+        });
+      }
+    }
+  };
+
   const handleResetVotes = async () => {
-    if (window.confirm('¿Estás seguro de reiniciar TODOS los votos? Esta acción no se puede deshacer.')) {
+    if (window.confirm(`¿Estás seguro de reiniciar los votos de la ronda ${config.ronda_actual}? Esta acción no se puede deshacer.`)) {
       try {
         await adminApi.resetVotes();
         setMessage({
@@ -71,7 +92,7 @@ const Configuracion = () => {
         console.error('Error resetting votes:', error);
         setMessage({
           type: 'error',
-          text: 'Error al reiniciar los votos'
+          text: error.response?.data?.error || 'Error al reiniciar los votos'
         });
       }
     }
@@ -242,11 +263,26 @@ const Configuracion = () => {
         </p>
 
         <div className="space-y-4">
+          <div className="flex items-center justify-between p-4 border border-blue-200 rounded-lg">
+            <div>
+              <h3 className="font-medium text-gray-800">Nueva Ronda de Votación</h3>
+              <p className="text-sm text-gray-600">
+                Archiva la ronda {config.ronda_actual} (sus resultados siguen disponibles) y empieza a contar desde cero
+              </p>
+            </div>
+            <button
+              onClick={handleNuevaRonda}
+              className="bg-blue-600 hover:bg-blue-700 text-white px-4 py-2 rounded-lg transition"
+            >
+              Abrir Ronda {config.ronda_actual + 1}
+            </button>
+          </div>
+
           <div className="flex items-center justify-between p-4 border border-red-200 rounded-lg">
             <div>
               <h3 className="font-medium text-gray-800">Reiniciar Votos</h3>
               <p className="text-sm text-gray-600">
-                Elimina todos los votos registrados en el sistema
+                Elimina los votos de la ronda actual ({config.ronda_actual}); las rondas archivadas se conservan
               </p>
             </div>
             <button
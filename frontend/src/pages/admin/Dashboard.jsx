@@ -32,9 +32,10 @@ const Dashboard = () => {
     loadStats();
   }, []);
 
-  const loadStats = async () => {
+  // Modo rápido por defecto: las tablas grandes usan conteos estimados
+  const loadStats = async (mode = 'fast') => {
     try {
-      const response = await adminApi.getStats();
+      const response = await adminApi.getStats(mode);
       setStats(response.data);
     } catch (error) {
       setError('Error al cargar estadísticas');
@@ -94,11 +95,14 @@ const Dashboard = () => {
     {
       title: 'Noticias',
       value: stats?.total_noticias || 0,
+      approximate: stats?.approximate?.includes('total_noticias'),
       icon: FiFileText,
       color: 'bg-orange-500',
     },
   ];
 
+  const hasApproximate = stats?.approximate?.length > 0;
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -130,7 +134,9 @@ const Dashboard = () => {
             <div className="flex items-center justify-between">
               <div>
                 <p className="text-gray-600 text-sm font-medium">{card.title}</p>
-                <p className="text-3xl font-bold text-gray-800 mt-2">{card.value}</p>
+                <p className="text-3xl font-bold text-gray-800 mt-2">
+                  {card.approximate ? `≈ ${card.value}` : card.value}
+                </p>
               </div>
               <div className={`${card.color} p-3 rounded-lg`}>
                 <card.icon className="text-white" size={24} />
@@ -140,6 +146,15 @@ const Dashboard = () => {
         ))}
       </div>
 
+      {hasApproximate && (
+        <p className="text-sm text-gray-500">
+          ≈ Valores estimados.{' '}
+          <button onClick={() => loadStats('exact')} className="text-blue-600 hover:underline">
+            Ver conteo exacto
+          </button>
+        </p>
+      )}
+
       {/* Chart */}
       {chartData && (
         <motion.div
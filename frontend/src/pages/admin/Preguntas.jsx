@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { FiEdit2, FiTrash2, FiPlus, FiX } from 'react-icons/fi';
 import adminApi from '../../services/adminApi';
+import MatrizPosiciones from '../../components/admin/MatrizPosiciones';
 
 const Preguntas = () => {
   const [preguntas, setPreguntas] = useState([]);
@@ -183,6 +184,9 @@ const Preguntas = () => {
         </div>
       )}
 
+      {/* Posiciones de los candidatos (usadas por el quiz) */}
+      <MatrizPosiciones preguntas={preguntas} />
+
       {/* Modal */}
       {showModal && (
         <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50 p-4">
@@ -25,13 +25,17 @@ const adminApi = {
 
   // Respuestas de candidatos
   getRespuestas: () => axios.get(`${API_URL}/api/admin/respuestas`),
+  getRespuestasMatriz: () => axios.get(`${API_URL}/api/admin/respuestas`, { params: { format: 'matrix' } }),
   createRespuesta: (data) => axios.post(`${API_URL}/api/admin/respuestas`, data),
+  getMatrizRespuestas: (params) => axios.get(`${API_URL}/api/admin/respuestas/matriz`, { params }),
+  saveMatrizRespuestas: (matriz) => axios.put(`${API_URL}/api/admin/respuestas/matriz`, matriz),
 
   // Estadísticas
-  getStats: () => axios.get(`${API_URL}/api/admin/stats`),
+  getStats: (mode = 'fast') => axios.get(`${API_URL}/api/admin/stats`, { params: { mode } }),
 
   // Utilidades
   resetVotes: () => axios.post(`${API_URL}/api/admin/reset-votes`),
+  nuevaRonda: () => axios.post(`${API_URL}/api/admin/rondas`),
   resetNews: () => axios.post(`${API_URL}/api/admin/reset-news`),
 
   // Fuentes de noticias